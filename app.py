@@ -1,306 +1,59 @@
-import pandas as pd
-
-import re
-import dateparser
-from dateparser.search import search_dates
+import argparse
+import hashlib
+import signal
+import subprocess
+import sys
+import tempfile
 from datetime import datetime
 
 import gradio as gr
 from datetime import datetime
 import base64, os
-
-from collections import defaultdict
-
-keyword_table = pd.read_excel(
-    'rules.xlsx',
-    sheet_name='Keyword definition',
-)
-
-CAL_YES = {"yes","y","ok","okay","sure","save","save it","please save"}
-
-def _extract_time(text: str) -> str:
-    """Return HH:MM from '09:30' or '9am/9 pm'. Empty string if none."""
-    m = re.search(r"\b([01]?\d|2[0-3]):([0-5]\d)\b", text)
-    if m:
-        return f"{m.group(1).zfill(2)}:{m.group(2)}"
-    m = re.search(r"\b([1-9]|1[0-2])\s*(am|pm)\b", text, flags=re.I)
-    if m:
-        h = int(m.group(1)); ampm = m.group(2).lower()
-        if ampm == "pm" and h != 12: h += 12
-        if ampm == "am" and h == 12: h = 0
-        return f"{h:02d}:00"
-    return ""
-
-DATE_HINT = (
-    r"(\b\d{4}-\d{2}-\d{2}\b|"                 # 2025-09-10
-    r"\b\d{1,2}/\d{1,2}/\d{2,4}\b|"            # 10/09/2025
-    r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\b|"
-    r"\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b|"
-    r"\b(?:tomorrow|today|tonight|next|this)\b|"
-    r"\b\d{1,2}\s*(am|pm)\b)"
-)
-
-def parse_datetime(text: str):
-    if not text:
-        return None, None
-
-    m = re.search(r"\b(\d{4})-(\d{2})-(\d{2})\b", text)
-    if m:
-        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}", _extract_time(text)
-
-    m = re.search(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b", text)
-    if m:
-        d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        if 1 <= d <= 31 and 1 <= mo <= 12:
-            return f"{y:04d}-{mo:02d}-{d:02d}", _extract_time(text)
-
-    if not re.search(DATE_HINT, text, flags=re.I):
-        return None, None
-
-    res = search_dates(
-        text,
-        languages=["en"],
-        settings={
-            "RETURN_AS_TIMEZONE_AWARE": False,
-            "PREFER_DATES_FROM": "future",
-            "STRICT_PARSING": True,                
-            "SKIP_TOKENS": ["to","ok","okay","save","calendar","i","am","please"]
-        }
-    )
-    if not res:
-        return None, None
-
-    picked = None
-    for frag, dt in res:
-        if re.search(r"\d{4}[-/]\d{1,2}[-/]\d{1,2}", frag):
-            picked = dt
-            break
-    if picked is None:
-        picked = res[0][1]
-
-    return picked.strftime("%Y-%m-%d"), _extract_time(text)
-
-def parse_calendar_command(text: str):
-    if not text:
-        return None, None, None
-    if re.search(r"\b(remind me|set (a )?reminder|save (it )?to (the )?calendar)\b", text, flags=re.I):
-        parts = re.split(r"\s+to\s+", text, maxsplit=1, flags=re.I)
-        date_part = parts[0]
-        title = parts[1].strip() if len(parts) > 1 and parts[1].strip() else "Tax reminder"
-        d, t = parse_datetime(date_part)
-        return title, d, t
-    return None, None, None
-
-def split_variants(variants_cell: str):
-    parts = [v.strip().lower() for v in str(variants_cell).split("|") if str(v).strip()]
-    seen, out = set(), []
-    for p in parts:
-        if p not in seen:
-            out.append(p); seen.add(p)
-    return out
-
-def find_keyword_hits(user_text: str):
-    text_low = (user_text or "").lower()
-    hits = []
-    for i, row in keyword_table.iterrows(): 
-        ev = str(row["event_key"]).strip()
-        key = str(row["keyword_key"]).strip()
-        variants = split_variants(row["keyword_variants"])
-        matched_vars = []
-        for v in variants:
-            pattern = r"\b" + re.escape(v) + r"\b"
-            if re.search(pattern, text_low, flags=re.IGNORECASE):
-                matched_vars.append(v)
-        if matched_vars:
-            hits.append((i, ev, key, matched_vars))
-    hits.sort(key=lambda x: x[0])
-    return hits
-
-def select_top_event(hits):
-    if not hits:
-        return [], None
-    count_by_event, first_row = defaultdict(int), {}
-    for idx, ev, _, _ in hits:
-        count_by_event[ev] += 1
-        if ev not in first_row:
-            first_row[ev] = idx
-    top_event = max(count_by_event.keys(), key=lambda e: (count_by_event[e], -first_row[e]))
-    selected = [h for h in hits if h[1] == top_event]
-    selected.sort(key=lambda x: x[0])
-    return selected, top_event
-
-def render_sources(rows_dicts):
-    seen = set()
-    lines = ["**Sources:**"]
-    for r in rows_dicts:
-        url = str(r.get("source_url", "")).strip()
-        if url and url not in seen:
-            title = (str(r.get("source_title") or "Official source")).strip()
-            lines.append(f"- {title}: {url}")
-            seen.add(url)
-    return "\n".join(lines) if seen else ""
-
-FRIENDLY_INTRO = {
-    "newborn_baby": "Congratulations on your new baby! 🎉 Let’s make the admin side feel easy.",
-    "new_baby_documents": "Congrats on your little one! 👶 Here’s a tidy checklist for the paperwork.",
-    "new_baby_income_check": "Happy news! With a new baby, a few money and tax settings are worth checking.",
-    "starting_new_job": "Congrats on the new role! 👔 I’ll help you zip through the onboarding.",
-    "redundancy_jobseeker": "I’m sorry to hear about the redundancy 💼 — here’s a practical plan to move forward.",
-    "redundancy_actions": "Let’s sort your payout, tax, and next steps after redundancy.",
-    "contractor_start": "Exciting shift to contracting! 🚀 Here’s how to set it up cleanly.",
-    "sole_trader_setup": "Going sole trader? Here’s the simple path to get started.",
-    "start_business_overview": "Starting a business — great! Here’s the one-page playbook.",
-    "small_business_setup": "Small business setup — we’ll keep it simple and compliant.",
-    "citizenship_tax": "Congrats on becoming an Australian citizen! 🇦🇺 A few tax settings might change.",
-    "disaster_recovery_support": "That sounds really tough. Here’s the official help available right now.",
-    "departing_australia_super": "Leaving Australia? Let’s check your super (DASP) and how tax works.",
-    "family_domestic_violence_support": "You’re not alone. Here are confidential supports and payments that can help.",
-    "first_home_temp_visa": "First home on a temporary visa? Here’s what to know early.",
-    "work_related_deductions": "Doing your tax? Here’s a quick guide to common work-related deductions.",
-    "graduate_job_search": "Fresh graduate — nice! Here are free tools and programs to land that first role.",
-}
-
-def pretty_event_title(ev_key: str) -> str:
-    mapping = {
-        "newborn_baby": "New baby — what to do next",
-        "new_baby_documents": "New baby — documents & registrations",
-        "new_baby_income_check": "New baby — payments & income checks",
-        "starting_new_job": "Starting a new job",
-        "redundancy_jobseeker": "Redundancy — JobSeeker & support",
-        "redundancy_actions": "Redundancy — tax & admin",
-        "contractor_start": "Starting as a contractor",
-        "sole_trader_setup": "Sole trader setup",
-        "start_business_overview": "Starting a business — overview",
-        "small_business_setup": "Small business setup",
-        "citizenship_tax": "Citizenship — tax settings",
-        "disaster_recovery_support": "Disaster recovery support",
-        "departing_australia_super": "Departing Australia — super (DASP)",
-        "family_domestic_violence_support": "Family & domestic violence support",
-        "first_home_temp_visa": "First home on a temporary visa",
-        "work_related_deductions": "Work-related deductions",
-        "graduate_job_search": "Graduate — job search",
-    }
-    return mapping.get(ev_key, "Here’s a quick plan")
-
-def compose_answer_from_rows(selected_hits, show_debug=False):
-    if not selected_hits:
-        return "I couldn’t recognise a relevant topic yet."
-
-    rows = [keyword_table.iloc[i].to_dict() for (i, ev, _, _) in selected_hits]
-    event_key = selected_hits[0][1]
-    intro = FRIENDLY_INTRO.get(event_key, "Here’s a simple checklist to help you move forward.")
-    heading = pretty_event_title(event_key)
-
-    bullets = []
-    for r in rows:
-        ans = str(r.get("short_answer", "")).strip()
-        if ans:
-            bullets.append(f"- {ans}")
-
-    parts = [f"{intro}\n\n**{heading}**\n\n" + "\n".join(bullets)]
-
-    src_md = render_sources(rows)
-    if src_md:
-        parts.append("\n\n" + src_md)
-
-    if show_debug:
-        dbg = [f"`{keyword_table.iloc[i]['keyword_key']}` ⇢ {', '.join(matched)}"
-               for (i, _, _, matched) in selected_hits]
-        parts.append("\n\n_" + " | ".join(dbg) + "_")
-
-    parts.append("\n\nIf you’d like, I can save a reminder for any dates or deadlines — "
-                 "just say something like *“remind me on 2025-09-10 at 09:00 to lodge my return”*.")
-
-    return "".join(parts)
-
-def chatbot_response(message, history, memory_events, show_debug, reminders, pending):
-    if not (message and str(message).strip()):
-        return "Please type something so I can help 🙂", memory_events, reminders, pending
-
-    text = message.strip()
-
-    if pending and text.lower() in CAL_YES:
-        tasks = reminders or []
-        new_id = (max([t["id"] for t in tasks], default=0) + 1)
-        tasks.append({
-            "id": new_id,
-            "title": pending.get("title","Tax reminder"),
-            "date": pending.get("date",""),
-            "time": pending.get("time",""),
-            "notes": pending.get("notes",""),
-            "done": False
-        })
-        reminders = tasks
-        saved = pending
-        pending = None
-        date_show = saved.get("date","(no date)")
-        time_show = (" " + saved["time"]) if saved.get("time") else ""
-        reply = f"✅ Saved to calendar: **{saved.get('title','Reminder')}** — {date_show}{time_show}\n\nYou can open the 📅 tab any time to view or edit."
-        return reply, memory_events, reminders, pending
-
-    title_cmd, date_cmd, time_cmd = parse_calendar_command(text)
-    if title_cmd and (date_cmd or time_cmd):
-        tasks = reminders or []
-        new_id = (max([t["id"] for t in tasks], default=0) + 1)
-        new_task = {"id": new_id, "title": title_cmd, "date": date_cmd or "", "time": time_cmd or "", "notes": "", "done": False}
-        tasks.append(new_task)
-        reminders = tasks
-        ds = new_task["date"] or "(no date)"
-        ts = (" " + new_task["time"]) if new_task["time"] else ""
-        reply = f"✅ Saved to calendar: **{new_task['title']}** — {ds}{ts}\n\nI’ve added it to your reminders. You can manage it in the 📅 tab."
-        return reply, memory_events, reminders, None
-    elif title_cmd or date_cmd or time_cmd:
-        return ("I can save that, but I need a date or time (e.g., **2025-09-10 09:00**). "
-                "Try: *remind me on 2025-09-10 at 09:00 to lodge my tax return*."), memory_events, reminders, pending
-
-    all_hits = find_keyword_hits(text)
-    selected_hits, chosen_event = select_top_event(all_hits)
-
-    if not selected_hits and not memory_events:
-        date_hint, time_hint = parse_datetime(text)
-        if date_hint or time_hint:
-            pending = {"title": "Tax reminder", "date": date_hint or "", "time": time_hint or "", "notes": ""}
-            ask = f"\n\n📅 I found a date {date_hint or ''} {time_hint or ''}. Save to calendar? (reply **yes** to confirm)"
-            return "I couldn’t recognise a keyword yet." + ask, memory_events, reminders, pending
-        return ("I’m not sure I caught the topic 🤔. "
-                "Try something like *“we just had a baby”*, *“I’m starting a new job”*, or *“I was made redundant”*."), memory_events, reminders, pending
-
-    if chosen_event and chosen_event not in memory_events:
-        memory_events.append(chosen_event)
-
-    reply = compose_answer_from_rows(selected_hits, show_debug=bool(show_debug))
-
-    date_hint, time_hint = parse_datetime(text)
-    if date_hint or time_hint:
-        pending = {"title": "Tax reminder", "date": date_hint or "", "time": time_hint or "", "notes": ""}
-        reply += f"\n\n📅 I noticed a date {date_hint or ''} {time_hint or ''}. Save to calendar? (reply **yes** to confirm)"
-
-    return reply, memory_events, reminders, pending
-
-def render_task_list(tasks):
-    if not tasks:
-        return "No reminders yet."
-    def srt(t):
-        d = t.get("date") or "9999-12-31"
-        tm = t.get("time") or "23:59"
-        return (t.get("done", False), d, tm)
-    tasks = sorted(tasks, key=srt)
-    by_date = {}
-    for t in tasks:
-        d = t.get("date") or "(no date)"
-        by_date.setdefault(d, []).append(t)
-    lines = []
-    for d in sorted(by_date.keys()):
-        lines.append(f"### {d}")
-        for t in by_date[d]:
-            status = "✅ Done" if t.get("done") else "⏳ Pending"
-            time_part = f" {t['time']}" if t.get("time") else ""
-            lines.append(f"- [{status}] **{t.get('title','(no title)')}** —{time_part}")
-    return "\n".join(lines)
+import logging
+import uuid
+
+from govmate import metrics
+from govmate.calendar import VIEWS, calendar_page
+from govmate.chat import (chatbot_response, chatbot_response_stream, reminder_banner, reminder_scheduler,
+                          reminder_store, rules_watcher)
+from govmate.dates import start_parse_pool
+from govmate.scheduler import ics_lines
+
+logging.basicConfig(level=logging.INFO)
+
+# Most matches the reminder search dropdown offers at once.
+SEARCH_LIMIT = 50
+# How often each open page checks for reminders that fell due (seconds).
+BANNER_POLL = 30
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "govmate-ics")
+# Stream replies: the answer shows before the date parse finishes (GOVMATE_STREAM=0: one message per turn).
+STREAM = os.environ.get("GOVMATE_STREAM", "1") != "0"
+
+def _owner(user, request):
+    """Reminder owner for one callback: the logged-in username when there is one.
+
+    ``user`` is the random id kept in the browser; every endpoint takes it from
+    the client, so it only identifies the owner when the app runs without auth.
+    """
+    return getattr(request, "username", None) or user
 
 def _opts(tasks):
     return [f"{t['id']} — {t['title']} ({t.get('date','')}{' '+t['time'] if t.get('time') else ''})" for t in (tasks or [])]
 
+def _calendar(user, status, view="All", start="", end="", page=1, search=""):
+    """(status, markdown, dropdown update, page) for one window of the user's reminders.
+
+    The dropdown lists reminders whose title matches ``search``, or the ones on
+    the current page when the search box is empty.
+    """
+    start, end = [(d or "").strip() for d in (start, end)]
+    start, end = [d if _validate_date_str(d) else "" for d in (start, end)]
+    md, tasks, page, _ = calendar_page(reminder_store(), user, view, start, end, page)
+    search = (search or "").strip()
+    if user and search:
+        tasks = reminder_store().search(user, search, limit=SEARCH_LIMIT)
+    return status, md, gr.update(choices=_opts(tasks), value=None), page
+
 def _validate_date_str(s):
     try:
         datetime.strptime(s, "%Y-%m-%d")
@@ -308,41 +61,74 @@ def _validate_date_str(s):
     except Exception:
         return False
 
-def add_task(title, date_str, time_str, notes, tasks):
+def _normalize_time_str(s):
+    """``s`` as HH:MM, or None when it is not a clock time."""
+    try:
+        return datetime.strptime(s, "%H:%M").strftime("%H:%M")
+    except ValueError:
+        return None
+
+@metrics.entry("add_task")
+def add_task(title, date_str, time_str, notes, user, view, start, end, page, search, request: gr.Request):
+    user, view = _owner(user, request), (view, start, end, page, search)
     title = (title or "").strip()
     if not title:
-        return tasks, "❌ Please enter a title.", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
+        return _calendar(user, "❌ Please enter a title.", *view)
     date_str = (date_str or "").strip()
     if not date_str or not _validate_date_str(date_str):
-        return tasks, "❌ Date must be in YYYY-MM-DD (e.g., 2025-09-10).", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
+        return _calendar(user, "❌ Date must be in YYYY-MM-DD (e.g., 2025-09-10).", *view)
     time_str = (time_str or "").strip()
-    if time_str and len(time_str.split(":")) != 2:
-        return tasks, "❌ Time must be HH:MM (e.g., 09:00).", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
-    new_id = (max([t["id"] for t in tasks], default=0) + 1) if tasks else 1
-    new_task = {"id": new_id, "title": title, "date": date_str, "time": time_str, "notes": (notes or "").strip(), "done": False}
-    tasks = (tasks or []) + [new_task]
-    return tasks, "✅ Added.", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
-
-def toggle_task(selected_label, tasks):
-    if not tasks:
-        return tasks, "No reminders.", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
+    if time_str:
+        time_str = _normalize_time_str(time_str)
+        if not time_str:
+            return _calendar(user, "❌ Time must be HH:MM (e.g., 09:00).", *view)
+    if not user:
+        return _calendar(user, "❌ Session not ready yet — please reload the page.", *view)
+    reminder_store().add(user, title, date_str, time_str, (notes or "").strip())
+    return _calendar(user, "✅ Added.", *view)
+
+@metrics.entry("toggle_task")
+def toggle_task(selected_label, user, view, start, end, page, search, request: gr.Request):
+    user, view = _owner(user, request), (view, start, end, page, search)
+    if not user or not reminder_store().count(user):
+        return _calendar(user, "No reminders.", *view)
     if not selected_label:
-        return tasks, "Select one first.", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
+        return _calendar(user, "Select one first.", *view)
     tid = int(str(selected_label).split(" — ")[0])
-    for t in tasks:
-        if t["id"] == tid:
-            t["done"] = not t.get("done", False)
-            break
-    return tasks, "✅ Toggled.", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
-
-def delete_task(selected_label, tasks):
-    if not tasks:
-        return tasks, "No reminders.", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
+    reminder_store().toggle(user, tid)
+    return _calendar(user, "✅ Toggled.", *view)
+
+@metrics.entry("delete_task")
+def delete_task(selected_label, user, view, start, end, page, search, request: gr.Request):
+    user, view = _owner(user, request), (view, start, end, page, search)
+    if not user or not reminder_store().count(user):
+        return _calendar(user, "No reminders.", *view)
     if not selected_label:
-        return tasks, "Select one first.", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
+        return _calendar(user, "Select one first.", *view)
     tid = int(str(selected_label).split(" — ")[0])
-    tasks = [t for t in tasks if t["id"] != tid]
-    return tasks, "🗑️ Deleted.", render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
+    reminder_store().delete(user, tid)
+    return _calendar(user, "🗑️ Deleted.", *view)
+
+def export_ics(user, request: gr.Request):
+    """Write all of the user's reminders to an .ics file and offer it for download."""
+    user = _owner(user, request)
+    if not user:
+        return gr.update(value=None, visible=False)
+    folder = os.path.join(EXPORT_DIR, hashlib.sha256(user.encode("utf-8")).hexdigest()[:16])
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, "govmate-reminders.ics")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.writelines(line + "\r\n" for line in ics_lines(reminder_store().list(user)))
+    return gr.update(value=path, visible=True)
+
+def show_due(user, request: gr.Request):
+    """Banner for reminders that fell due since the last check; hidden when there are none."""
+    user = _owner(user, request)
+    due = reminder_banner().take(user) if user else []
+    if not due:
+        return gr.update(value="", visible=False)
+    lines = [f"🔔 **{r['title']}** — {r['date']}{' ' + r['time'] if r.get('time') else ''}" for r in due]
+    return gr.update(value="\n\n".join(lines), visible=True)
 
 def to_chat():
     return gr.update(visible=True), gr.update(visible=False)
@@ -350,8 +136,32 @@ def to_chat():
 def to_calendar():
     return gr.update(visible=False), gr.update(visible=True)
 
-def refresh(tasks):
-    return render_task_list(tasks), gr.update(choices=_opts(tasks), value=None)
+@metrics.entry("refresh")
+def refresh(user, view="All", start="", end="", page=1, search="", request: gr.Request = None):
+    return _calendar(_owner(user, request), None, view, start, end, page, search)[1:]
+
+def first_page(user, view, start, end, page, search, request: gr.Request):
+    return refresh(user, view, start, end, 1, search, request)
+
+def prev_page(user, view, start, end, page, search, request: gr.Request):
+    return refresh(user, view, start, end, (page or 1) - 1, search, request)
+
+def next_page(user, view, start, end, page, search, request: gr.Request):
+    return refresh(user, view, start, end, (page or 1) + 1, search, request)
+
+def filter_choices(user, view, start, end, page, search, request: gr.Request):
+    return refresh(user, view, start, end, page, search, request)[1]
+
+def ensure_user(user, view, start, end, page, search, request: gr.Request):
+    """Reminder owner: the logged-in username, else a random id kept in the browser."""
+    user = _owner(user, request) or uuid.uuid4().hex
+    return (user,) + refresh(user, view, start, end, page, search, request)
+
+def chat_stream(message, history, memory_events, show_debug, user, pending, request: gr.Request):
+    yield from chatbot_response_stream(message, history, memory_events, show_debug, _owner(user, request), pending)
+
+def chat_reply(message, history, memory_events, show_debug, user, pending, request: gr.Request):
+    return chatbot_response(message, history, memory_events, show_debug, _owner(user, request), pending)
 
 def build_logo_html(path="/content/govmate_logo.png", max_h=80):
     if not os.path.exists(path):
@@ -394,16 +204,18 @@ with gr.Blocks(css="""
                 btn_chat = gr.Button(value="💬", elem_id="btn-chat", variant="secondary")
                 btn_cal  = gr.Button(value="📅", elem_id="btn-cal",  variant="secondary")
 
+    due_banner = gr.Markdown(visible=False)
+
     memory_events   = gr.State(value=[])
-    reminders_state = gr.State(value=[])
+    user_state      = gr.BrowserState(None, storage_key="govmate_user")
     pending_state   = gr.State(value=None)
     show_debug_state = gr.State(value=False)
 
     with gr.Group(visible=True, elem_id="chat_view") as chat_view:
         gr.ChatInterface(
-            fn=chatbot_response,
-            additional_inputs=[memory_events, show_debug_state, reminders_state, pending_state],
-            additional_outputs=[memory_events, reminders_state, pending_state],
+            fn=chat_stream if STREAM else chat_reply,
+            additional_inputs=[memory_events, show_debug_state, user_state, pending_state],
+            additional_outputs=[memory_events, user_state, pending_state],
             title="MyGovMate",
             description=(
                 "💡 Quick Guide:\n"
@@ -416,7 +228,15 @@ with gr.Blocks(css="""
 
     with gr.Group(visible=False) as cal_view_group:
         gr.Markdown("### Your Reminders")
-        cal_md = gr.Markdown(render_task_list([]))
+        with gr.Row():
+            view_in = gr.Radio(choices=list(VIEWS), value="All", label="Show")
+            from_in = gr.Textbox(label="From (YYYY-MM-DD)", placeholder="2025-09-01")
+            to_in   = gr.Textbox(label="To (YYYY-MM-DD)", placeholder="2025-09-30")
+        cal_md = gr.Markdown("No reminders yet.")
+        with gr.Row():
+            prev_btn = gr.Button("◀ Prev", variant="secondary")
+            page_num = gr.Number(value=1, precision=0, minimum=1, label="Page")
+            next_btn = gr.Button("Next ▶", variant="secondary")
         refresh_btn = gr.Button("Refresh now", variant="secondary")
 
         with gr.Row():
@@ -429,25 +249,129 @@ with gr.Blocks(css="""
         add_btn = gr.Button("Add")
         status  = gr.Markdown()
 
+        search_in = gr.Textbox(label="Find a reminder", placeholder="Type part of a title")
         select_dd = gr.Dropdown(choices=[], label="Select a reminder")
         with gr.Row():
             toggle_btn = gr.Button("Mark as Done/Undone")
             delete_btn = gr.Button("Delete")
-
-        add_btn.click(add_task, inputs=[title_in, date_in, time_in, notes_in, reminders_state],
-                      outputs=[reminders_state, status, cal_md, select_dd])
-        toggle_btn.click(toggle_task, inputs=[select_dd, reminders_state],
-                         outputs=[reminders_state, status, cal_md, select_dd])
-        delete_btn.click(delete_task, inputs=[select_dd, reminders_state],
-                         outputs=[reminders_state, status, cal_md, select_dd])
-        refresh_btn.click(refresh, inputs=[reminders_state], outputs=[cal_md, select_dd])
+        export_btn = gr.Button("Export all to calendar (.ics)", variant="secondary")
+        export_file = gr.File(label="iCalendar file", visible=False)
+
+        # Every calendar callback sees the same window: user, view, date range, page, search.
+        view_state = [user_state, view_in, from_in, to_in, page_num, search_in]
+        cal_out = [cal_md, select_dd, page_num]
+
+        add_btn.click(add_task, inputs=[title_in, date_in, time_in, notes_in] + view_state,
+                      outputs=[status] + cal_out)
+        toggle_btn.click(toggle_task, inputs=[select_dd] + view_state,
+                         outputs=[status] + cal_out)
+        delete_btn.click(delete_task, inputs=[select_dd] + view_state,
+                         outputs=[status] + cal_out)
+        refresh_btn.click(refresh, inputs=view_state, outputs=cal_out)
+        prev_btn.click(prev_page, inputs=view_state, outputs=cal_out)
+        next_btn.click(next_page, inputs=view_state, outputs=cal_out)
+        page_num.submit(refresh, inputs=view_state, outputs=cal_out)
+        view_in.change(first_page, inputs=view_state, outputs=cal_out)
+        from_in.submit(first_page, inputs=view_state, outputs=cal_out)
+        to_in.submit(first_page, inputs=view_state, outputs=cal_out)
+        search_in.change(filter_choices, inputs=view_state, outputs=[select_dd])
+        export_btn.click(export_ics, inputs=[user_state], outputs=[export_file])
 
     btn_chat.click(to_chat, inputs=[], outputs=[chat_view, cal_view_group]) \
-             .then(refresh, inputs=[reminders_state], outputs=[cal_md, select_dd])
+             .then(refresh, inputs=view_state, outputs=cal_out)
     btn_cal.click(to_calendar, inputs=[], outputs=[chat_view, cal_view_group]) \
-            .then(refresh, inputs=[reminders_state], outputs=[cal_md, select_dd])
-
-    demo.load(lambda t: (render_task_list(t), gr.update(choices=_opts(t), value=None)),
-              inputs=[reminders_state], outputs=[cal_md, select_dd])
+            .then(refresh, inputs=view_state, outputs=cal_out)
+
+    demo.load(ensure_user, inputs=view_state, outputs=[user_state] + cal_out)
+    gr.Timer(BANNER_POLL).tick(show_due, inputs=[user_state], outputs=[due_banner], show_progress="hidden")
+
+def _queue_size(value):
+    """--max-queue / GOVMATE_MAX_QUEUE: events that may wait, 0 for no limit."""
+    size = int(value)
+    if size < 0:
+        raise argparse.ArgumentTypeError(f"queue size must be 0 (no limit) or more, not {size}")
+    return size
+
+# Launch settings: (environment variable, type, default, default with --production).
+SETTINGS = {
+    "host":          ("GOVMATE_HOST", str, None, "0.0.0.0"),
+    "port":          ("GOVMATE_PORT", int, 7860, 7860),
+    "share":         ("GOVMATE_SHARE", lambda v: v != "0", True, False),
+    "debug":         ("GOVMATE_DEBUG", lambda v: v != "0", True, False),
+    "concurrency":   ("GOVMATE_CONCURRENCY", int, 1, 8),
+    "max_queue":     ("GOVMATE_MAX_QUEUE", _queue_size, None, 256),
+    "parse_workers": ("GOVMATE_PARSE_WORKERS", int, 0, 1),
+    "processes":     ("GOVMATE_PROCESSES", int, 1, 1),
+    "scheduler":     ("GOVMATE_SCHEDULER", lambda v: v != "0", True, True),
+}
 
-demo.launch(share=True, debug=True)
\ No newline at end of file
+def _settings(args):
+    """Flag, else environment variable, else the (production) default."""
+    for name, (var, cast, default, production) in SETTINGS.items():
+        if getattr(args, name) is None:
+            value = os.environ.get(var)
+            setattr(args, name, cast(value) if value else (production if args.production else default))
+    return args
+
+def serve_many(args):
+    """Run ``args.processes`` single-process servers on consecutive ports and wait.
+
+    Each process keeps its own sessions (chat memory, pending dates), so put them
+    behind a sticky reverse proxy (see deploy/nginx.conf); reminders are shared
+    through the SQLite store.
+    """
+    procs = []
+    for i in range(args.processes):
+        cmd = [sys.executable, os.path.abspath(__file__), "--processes", "1", "--no-share", "--no-debug",
+               "--port", str(args.port + i), "--concurrency", str(args.concurrency),
+               "--parse-workers", str(args.parse_workers),
+               "--scheduler" if args.scheduler else "--no-scheduler"]
+        if args.host:
+            cmd += ["--host", args.host]
+        if args.max_queue is not None:
+            cmd += ["--max-queue", str(args.max_queue)]
+        procs.append(subprocess.Popen(cmd))
+    logging.info("Serving on ports %d-%d", args.port, args.port + args.processes - 1)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # run the cleanup below
+    try:
+        for proc in procs:
+            proc.wait()
+    finally:
+        for proc in procs:
+            proc.terminate()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the MyGovMate web app.")
+    ap.add_argument("--production", action="store_true",
+                    help="serving defaults: all interfaces, no share link, no debug, 8 concurrent "
+                         "events, queue capped at 256, dateparser in a worker process")
+    ap.add_argument("--host", help="interface to bind (default: 127.0.0.1)")
+    ap.add_argument("--port", type=int, help="port, or first port with --processes (default: 7860)")
+    ap.add_argument("--share", action=argparse.BooleanOptionalAction,
+                    help="also publish a temporary gradio.live link (default: on)")
+    ap.add_argument("--debug", action=argparse.BooleanOptionalAction,
+                    help="block and print errors to the console (default: on)")
+    ap.add_argument("--concurrency", type=int,
+                    help="events each handler runs at once (gradio default_concurrency_limit; default: 1)")
+    ap.add_argument("--max-queue", type=_queue_size,
+                    help="reject new events once this many are waiting; 0 for no limit (default: unbounded)")
+    ap.add_argument("--parse-workers", type=int,
+                    help="processes for dateparser fallbacks (default: 0, parse in the handler thread)")
+    ap.add_argument("--processes", type=int,
+                    help="run this many servers on consecutive ports (default: 1)")
+    ap.add_argument("--scheduler", action=argparse.BooleanOptionalAction,
+                    help="fire reminders when they fall due (default: on)")
+    args = _settings(ap.parse_args(argv))
+
+    if args.processes > 1:
+        return serve_many(args)
+    start_parse_pool(args.parse_workers)  # fork the workers before the server starts its threads
+    rules_watcher()  # load the rules before the first message, not during it
+    if args.scheduler:
+        reminder_scheduler().start()
+    demo.queue(default_concurrency_limit=args.concurrency, max_size=args.max_queue or None)
+    demo.launch(server_name=args.host, server_port=args.port, share=args.share, debug=args.debug,
+                app_kwargs={"routes": metrics.routes()})
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
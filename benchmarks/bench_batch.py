@@ -0,0 +1,64 @@
+"""Throughput of the offline classifier (govmate.batch) on a large synthetic export.
+
+Writes ``--lines`` messages drawn from benchmarks/workload.py to a temporary
+JSONL file, then classifies it end to end (read, classify, write JSONL) in
+process and with each ``--workers`` count.
+
+    python -m benchmarks.bench_batch --lines 1000000 --workers 2 4
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.workload import DATE_ONLY, DATE_PHRASES, OFF_TOPIC, REMINDER_COMMANDS, event_message
+from govmate.batch import classify_stream, read_messages, write_results
+from govmate.rules import load_rules
+
+
+def write_export(path, lines, seed=0):
+    rng = random.Random(seed)
+    variants = list(load_rules().index.variants_by_event().values())
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(lines):
+            roll = rng.random()
+            if roll < 0.55:
+                text = event_message(rng, rng.choice(variants))
+            elif roll < 0.70:
+                text = f"{event_message(rng, rng.choice(variants))} {rng.choice(DATE_PHRASES)}"
+            elif roll < 0.80:
+                text = rng.choice(REMINDER_COMMANDS + DATE_ONLY)
+            else:
+                text = f"{rng.choice(OFF_TOPIC)} (ref {n})"
+            f.write(json.dumps({"text": text}) + "\n")
+
+
+def run(src, dst, workers, dates):
+    t0 = time.perf_counter()
+    with open(src, encoding="utf-8") as fin, open(dst, "w", encoding="utf-8") as fout:
+        n, events = write_results(classify_stream(read_messages(fin, "jsonl"), workers=workers, dates=dates), fout)
+    return n, time.perf_counter() - t0, n - events.get(None, 0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--workers", type=int, nargs="*", default=[os.cpu_count() or 1])
+    ap.add_argument("--no-dates", action="store_true")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "export.jsonl"), os.path.join(tmp, "triage.jsonl")
+        write_export(src, args.lines)
+        print(f"{args.lines:,} messages ({os.path.getsize(src) / 1e6:.0f} MB), "
+              f"dates {'off' if args.no_dates else 'on'}")
+        for workers in [0] + [w for w in args.workers if w > 1]:
+            n, elapsed, matched = run(src, dst, workers, not args.no_dates)
+            label = "in process" if workers <= 1 else f"{workers} workers"
+            print(f"  {label:<12} {elapsed:7.1f} s  {n / elapsed:10,.0f} msg/s  matched {matched / n:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Golden corpus + benchmark for the parse_datetime fast path.
+
+benchmarks/date_golden.jsonl holds chat messages with the (date, time) that the
+dateparser-only path returns for a fixed reference time. This checks that
+parse_datetime (fast path enabled) returns identical results, then reports how
+many calls skip dateparser and the time per call.
+
+    python -m benchmarks.bench_dates              # check + benchmark
+    python -m benchmarks.bench_dates --regenerate # rewrite expectations with dateparser
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from datetime import datetime
+
+from govmate.dates import DATE_HINT, UNRESOLVED, parse_datetime, resolve_common
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "date_golden.jsonl")
+# A Wednesday morning; relative phrases in the corpus resolve against this.
+REFERENCE = datetime(2025, 9, 3, 10, 30)
+
+
+def read_golden(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_golden(path, texts):
+    """Record what the dateparser-only path returns for each message."""
+    with open(path, "w", encoding="utf-8") as f:
+        for text in texts:
+            d, t = parse_datetime(text, REFERENCE, fast=False)
+            f.write(json.dumps({"text": text, "date": d, "time": t}, ensure_ascii=False) + "\n")
+
+
+def per_call_ms(texts, **kwargs):
+    samples = []
+    for text in texts:
+        t0 = time.perf_counter()
+        parse_datetime(text, REFERENCE, **kwargs)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--regenerate", action="store_true")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.regenerate:
+        write_golden(GOLDEN, [row["text"] for row in read_golden(GOLDEN)])
+
+    golden = read_golden(GOLDEN)
+    mismatches = 0
+    for row in golden:
+        expected = (row["date"], row["time"])
+        got = parse_datetime(row["text"], REFERENCE)
+        if got != expected:
+            mismatches += 1
+            print(f"MISMATCH {row['text']!r}: expected {expected}, got {got}")
+
+    texts = [row["text"] for row in golden]
+    hinted = [t for t in texts if not re.search(r"\b\d{4}-\d{2}-\d{2}\b", t) and re.search(DATE_HINT, t, flags=re.I)]
+    resolved = sum(resolve_common(t, REFERENCE) is not UNRESOLVED for t in hinted)
+    skipped = len(texts) - (len(hinted) - resolved)
+
+    parse_datetime("warm up dateparser tomorrow at 9am", REFERENCE, fast=False)
+    fast = [s for _ in range(args.repeat) for s in per_call_ms(texts)]
+    slow = [s for _ in range(args.repeat) for s in per_call_ms(texts, fast=False)]
+
+    print(f"golden corpus: {len(golden)} messages, {mismatches} mismatches")
+    print(f"reach the DATE_HINT stage: {len(hinted)}, resolved without dateparser: {resolved} "
+          f"({resolved / max(len(hinted), 1):.0%})")
+    print(f"calls that skip dateparser overall: {skipped}/{len(texts)} ({skipped / len(texts):.0%})")
+    for name, s in (("dateparser only", slow), ("fast path", fast)):
+        print(f"  {name:<16} mean {statistics.fmean(s):7.3f} ms/call   total {sum(s) / args.repeat:8.1f} ms")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Fuzzy keyword matching: recall on misspelt messages and per-message latency.
+
+Builds KeywordIndex and FuzzyIndex over rules.xlsx, and over the same table
+grown with synthetic variants (as bench_keyword_index does), then times
+exact-only matching against exact + fuzzy matching (what GOVMATE_FUZZY=1 runs)
+on clean and on misspelt/inflected messages. The fuzzy lookup cache starts
+cold for every run. Recall counts misspelt messages whose intended event wins;
+the EXAMPLES below must all win, or the run exits with status 1.
+
+The default budget (2 ms at p99) keeps keyword matching cheaper than a single
+dateparser fallback, the slowest stage a chat turn already has.
+
+    python -m benchmarks.bench_fuzzy [--variants 12000] [--messages 500] [--budget-ms 2]
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from benchmarks.bench_keyword_index import build_index, grow_table, make_messages
+from benchmarks.workload import percentiles
+from govmate.fuzzy import FuzzyIndex, with_fuzzy
+from govmate.matcher import split_variants
+from govmate.ranking import EventRanker
+
+# Typos and inflections that fuzzy matching exists for; exact matching finds
+# none of them, and each must reach its event.
+EXAMPLES = (
+    ("I was made redundent last week", "redundancy_jobseeker"),
+    ("we just had babies", "newborn_baby"),
+    ("I'm contracting for a big company now", "contractor_start"),
+    ("are union fees tax deductable?", "work_related_deductions"),
+)
+
+
+def misspell(rng, word):
+    """One typo or inflection: drop, swap, double a letter, or add a suffix."""
+    if len(word) < 5:
+        return word + rng.choice(("s", "ing"))
+    i = rng.randrange(1, len(word) - 1)
+    return rng.choice((
+        word[:i] + word[i + 1:],
+        word[:i] + word[i + 1] + word[i] + word[i + 2:],
+        word[:i] + word[i] + word[i:],
+        word + "s",
+    ))
+
+
+def misspelt_messages(table, n, seed=0):
+    """``[(message, intended event)]`` with one word of a real variant misspelt."""
+    rng = random.Random(seed)
+    rows = [(str(r["event_key"]).strip(), split_variants(r["keyword_variants"])) for _, r in table.iterrows()]
+    out = []
+    for _ in range(n):
+        ev, variants = rng.choice(rows)
+        words = rng.choice(variants).split()
+        k = max(range(len(words)), key=lambda j: len(words[j]))
+        words[k] = misspell(rng, words[k])
+        out.append((f"hi, {' '.join(words)} - what now?", ev))
+    return out
+
+
+def keywords(table):
+    return [(i, str(r["event_key"]).strip(), str(r["keyword_key"]).strip(), split_variants(r["keyword_variants"]))
+            for i, r in table.iterrows()]
+
+
+def time_matcher(fn, msgs):
+    samples, results = [], []
+    for m in msgs:
+        t0 = time.perf_counter()
+        results.append(fn(m))
+        samples.append((time.perf_counter() - t0) * 1000)
+    return results, samples
+
+
+def line(name, samples, budget):
+    pct = percentiles(samples)
+    verdict = "ok" if pct[99] <= budget else "OVER BUDGET"
+    return f"  {name:<22} p50={pct[50]:7.3f} ms  p95={pct[95]:7.3f} ms  p99={pct[99]:7.3f} ms  {verdict}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rules", default="rules.xlsx")
+    ap.add_argument("--variants", type=int, default=12000)
+    ap.add_argument("--messages", type=int, default=500)
+    ap.add_argument("--budget-ms", type=float, default=2.0, help="p99 matching budget per message")
+    args = ap.parse_args()
+
+    base = pd.read_excel(args.rules, sheet_name="Keyword definition")
+    misses = 0
+    for label, table in (("rules.xlsx", base), ("grown", grow_table(base, args.variants)[0])):
+        rows = keywords(table)
+        t0 = time.perf_counter()
+        fuzzy = FuzzyIndex(rows)
+        build_ms = (time.perf_counter() - t0) * 1000
+        exact = build_index(table)
+        ranker = EventRanker(rows, exact)
+
+        def top_event(hits, weights=None):
+            ranked = ranker.rank(hits, weights, k=1)
+            return ranked[0][0] if ranked else None
+
+        clean = make_messages(table, args.messages)
+        typos = misspelt_messages(base, args.messages)
+        print(f"{label}: {len(table)} rows, {len(fuzzy)} token variants, fuzzy index build {build_ms:.0f} ms")
+
+        for name, msgs in (("clean", clean), ("misspelt", [m for m, _ in typos])):
+            fuzzy = FuzzyIndex(rows)  # cold lookup cache
+            _, exact_ms = time_matcher(exact.search, msgs)
+            picked, fuzzy_ms = time_matcher(
+                lambda m: top_event(*with_fuzzy(exact.search(m), fuzzy, m)), msgs)
+            print(line(f"{name}, exact", exact_ms, args.budget_ms))
+            print(line(f"{name}, exact + fuzzy", fuzzy_ms, args.budget_ms))
+            if name == "misspelt":
+                exact_hit = sum(top_event(exact.search(m)) == ev for m, ev in typos)
+                fuzzy_hit = sum(p == ev for p, (_, ev) in zip(picked, typos))
+                print(f"  recall on misspelt: exact {exact_hit / len(typos):.0%}, "
+                      f"exact + fuzzy {fuzzy_hit / len(typos):.0%}")
+        hit = 0
+        for msg, ev in EXAMPLES:
+            got = top_event(*with_fuzzy(exact.search(msg), fuzzy, msg))
+            hit += got == ev
+            if got != ev:
+                print(f"  MISS {msg!r}: expected {ev}, got {got}")
+        misses += len(EXAMPLES) - hit
+        print(f"  examples: {hit}/{len(EXAMPLES)} reach their event")
+        print()
+    if misses:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
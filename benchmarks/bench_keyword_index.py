@@ -0,0 +1,122 @@
+"""Microbenchmark: per-row regex scan vs. the precomputed KeywordIndex.
+
+Grows the rule table in rules.xlsx with synthetic variants (10k+ by default),
+checks that both matchers return identical hits, and prints per-message timings.
+
+    python -m benchmarks.bench_keyword_index [--variants 12000] [--messages 200]
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+
+import pandas as pd
+
+from govmate.matcher import KeywordIndex, split_variants
+
+FILLER = ("hi there", "i need some help", "what should i do now", "thanks",
+          "my partner and i", "last week", "can you explain", "about tax")
+
+
+def scan_hits(keyword_table, user_text):
+    """The original per-message scan from app.find_keyword_hits."""
+    text_low = (user_text or "").lower()
+    hits = []
+    for i, row in keyword_table.iterrows():
+        ev = str(row["event_key"]).strip()
+        key = str(row["keyword_key"]).strip()
+        variants = split_variants(row["keyword_variants"])
+        matched_vars = []
+        for v in variants:
+            pattern = r"\b" + re.escape(v) + r"\b"
+            if re.search(pattern, text_low, flags=re.IGNORECASE):
+                matched_vars.append(v)
+        if matched_vars:
+            hits.append((i, ev, key, matched_vars))
+    hits.sort(key=lambda x: x[0])
+    return hits
+
+
+def grow_table(table, target_variants):
+    """Append synthetic rows (variants derived from the real ones) until the
+    table holds at least ``target_variants`` variants."""
+    frames, total, k = [table], sum(len(split_variants(c)) for c in table["keyword_variants"]), 0
+    while total < target_variants:
+        k += 1
+        clone = table.copy()
+        clone["keyword_key"] = clone["keyword_key"] + f"_syn{k}"
+        clone["event_key"] = clone["event_key"] + f"_syn{k}"
+        clone["keyword_variants"] = [
+            "|".join(f"{v} option {k} {j}" for v in split_variants(c))
+            for j, c in enumerate(table["keyword_variants"])
+        ]
+        total += sum(len(split_variants(c)) for c in clone["keyword_variants"])
+        frames.append(clone)
+    return pd.concat(frames, ignore_index=True), total
+
+
+def make_messages(table, n, seed=0):
+    rng = random.Random(seed)
+    variants = sorted({v for c in table["keyword_variants"] for v in split_variants(c)})
+    msgs = []
+    for _ in range(n):
+        parts = [rng.choice(FILLER)]
+        for _ in range(rng.randint(0, 2)):
+            parts.append(rng.choice(variants))
+        rng.shuffle(parts)
+        msgs.append((" ".join(parts)).capitalize() + rng.choice([".", "!", "?", ""]))
+    return msgs
+
+
+def build_index(table):
+    return KeywordIndex(
+        (i, str(row["event_key"]).strip(), str(row["keyword_key"]).strip(), split_variants(row["keyword_variants"]))
+        for i, row in table.iterrows()
+    )
+
+
+def timed(fn, msgs):
+    out, samples = [], []
+    for m in msgs:
+        t0 = time.perf_counter()
+        out.append(fn(m))
+        samples.append(time.perf_counter() - t0)
+    return out, samples
+
+
+def report(name, samples):
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(0.95 * (len(ms) - 1))]
+    print(f"{name:<14} mean {statistics.fmean(ms):8.3f} ms   p50 {statistics.median(ms):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rules", default="rules.xlsx")
+    ap.add_argument("--variants", type=int, default=12000)
+    ap.add_argument("--messages", type=int, default=200)
+    args = ap.parse_args()
+
+    base = pd.read_excel(args.rules, sheet_name="Keyword definition")
+    table, total = grow_table(base, args.variants)
+    msgs = make_messages(table, args.messages)
+
+    t0 = time.perf_counter()
+    index = build_index(table)
+    build_s = time.perf_counter() - t0
+    print(f"rows={len(table)} variants={total} unique={len(index)} messages={len(msgs)} "
+          f"index build {build_s * 1000:.1f} ms")
+
+    expected, scan_samples = timed(lambda m: scan_hits(table, m), msgs)
+    got, index_samples = timed(index.search, msgs)
+    mismatches = sum(a != b for a, b in zip(expected, got))
+    report("regex scan", scan_samples)
+    report("KeywordIndex", index_samples)
+    print(f"speedup x{sum(scan_samples) / sum(index_samples):.0f}, mismatches: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Per-stage latency and throughput of the chat pipeline, without a browser.
+
+Drives govmate.chat (the pipeline behind the UI, without gradio) with a
+synthetic workload (benchmarks/workload.py):
+
+* each pipeline stage on its own, uncached: reminder-command parsing, keyword
+  matching, event ranking, answer composition and date parsing, then answer
+  composition again from warmed fragments;
+* chatbot_response end to end, per turn kind, with the memo caches disabled
+  and then warm;
+* chatbot_response_stream with the caches disabled: time to the first chunk
+  (what the user waits for before text appears) and to the last.
+
+Reminders go to a throwaway SQLite file, never to govmate.db.
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --sessions 1000 --turns 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from benchmarks.workload import build_sessions, format_row
+
+
+def load_chat(db_path):
+    os.environ["GOVMATE_DB"] = db_path
+    from govmate import chat
+    return chat
+
+
+def time_stages(chat, sessions):
+    """Stage name -> per-call ms, calling each stage function directly.
+
+    Run with the memo caches off, so repeated messages are timed in full.
+    """
+    from govmate.dates import parse_datetime
+    rules = chat.rules_watcher().rules
+    now = datetime.now()
+    samples = defaultdict(list)
+
+    def timed(stage, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        out = fn(*args, **kwargs)
+        samples[stage].append((time.perf_counter() - t0) * 1000)
+        return out
+
+    for convo in sessions:
+        for kind, text in convo:
+            if kind == "yes":
+                continue
+            timed("calendar_command", chat.parse_calendar_command, text)
+            hits, weights = timed("match_keywords", chat.match_keywords, text, rules)
+            ranked = timed("rank_events", rules.ranker.rank, hits, weights, 1 + chat.ALSO_RELEVANT)
+            selected, _, also = chat.split_ranked(ranked)
+            timed("compose_answer", chat.compose_answer_from_rows, selected, rules=rules, also=also)
+            timed("parse_datetime", parse_datetime, text, now)
+    return samples
+
+
+def replay(chat, sessions):
+    """Run every session through chatbot_response; (kind -> ms samples, wall seconds)."""
+    samples = defaultdict(list)
+    start = time.perf_counter()
+    for n, convo in enumerate(sessions):
+        memory, user, pending = [], f"bench-{n}", None
+        history = []
+        for kind, text in convo:
+            t0 = time.perf_counter()
+            reply, memory, user, pending = chat.chatbot_response(text, history, memory, False, user, pending)
+            samples[kind].append((time.perf_counter() - t0) * 1000)
+            history += [{"role": "user", "content": text}, {"role": "assistant", "content": reply}]
+    return samples, time.perf_counter() - start
+
+
+def replay_stream(chat, sessions):
+    """Run every session through chatbot_response_stream; (kind -> first-chunk ms, kind -> last-chunk ms)."""
+    first, last = defaultdict(list), defaultdict(list)
+    for n, convo in enumerate(sessions):
+        memory, user, pending = [], f"bench-stream-{n}", None
+        for kind, text in convo:
+            t0 = time.perf_counter()
+            ttft = None
+            for reply, memory, user, pending in chat.chatbot_response_stream(text, [], memory, False, user, pending):
+                if ttft is None:
+                    ttft = (time.perf_counter() - t0) * 1000
+            first[kind].append(ttft)
+            last[kind].append((time.perf_counter() - t0) * 1000)
+    return first, last
+
+
+def report_replay(title, samples, elapsed):
+    print(title)
+    every = [ms for kind in samples for ms in samples[kind]]
+    for kind in sorted(samples):
+        print("  " + format_row(kind, samples[kind]))
+    print("  " + format_row("all turns", every, elapsed))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=300)
+    ap.add_argument("--turns", type=int, default=6)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chat = load_chat(os.path.join(tmp, "bench.db"))
+        rules = chat.rules_watcher().rules
+        sessions = build_sessions(rules.index.variants_by_event(), list(chat.FRIENDLY_INTRO),
+                                  args.sessions, args.turns, args.seed)
+        turns = sum(len(c) for c in sessions)
+        print(f"{len(sessions)} sessions, {turns} turns, {len(rules.store)} rule rows\n")
+
+        # Warm-up so imports and dateparser's first-call setup are not measured.
+        replay(chat, sessions[:5])
+
+        caches = chat.answer_cache, chat.date_cache, chat.fragment_cache
+        sizes = [c.maxsize for c in caches]
+        for c in caches:
+            c.maxsize = 0
+            c.clear()
+        print("Stages (uncached)")
+        for stage, ms in time_stages(chat, sessions).items():
+            print("  " + format_row(stage, ms))
+        chat.fragment_cache.maxsize = sizes[2]
+        chat.warm_fragments(rules)
+        print("  " + format_row("compose_answer, warm", time_stages(chat, sessions)["compose_answer"]))
+        chat.fragment_cache.maxsize = 0
+        chat.fragment_cache.clear()
+        print()
+        report_replay("chatbot_response, caches off", *replay(chat, sessions))
+        first, last = replay_stream(chat, sessions)
+        print()
+        report_replay("chatbot_response_stream, caches off: first chunk", first, None)
+        print()
+        report_replay("chatbot_response_stream, caches off: last chunk", last, None)
+        for c, size in zip(caches, sizes):
+            c.maxsize = size
+            c.clear()
+        chat.warm_fragments(rules)
+        replay(chat, sessions)
+        print()
+        report_replay("chatbot_response, caches warm", *replay(chat, sessions))
+        print(f"\ncache stats: {chat.cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Throughput of ``app.py --production`` as the number of server processes grows.
+
+For each ``--processes`` count this starts that many servers (app.py's own
+``--processes`` launcher, fresh SQLite file), replays the same loadgen workload
+with sessions pinned round-robin to a server (what the sticky proxy in
+deploy/nginx.conf does), and stops them again. The load generator runs on the
+same machine, so leave it a core: on a host with C cores, counts up to C - 1
+are meaningful.
+
+    python -m benchmarks.bench_scaling --processes 1 2 4 --sessions 200 --concurrency 32
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.loadgen import run_load
+from benchmarks.workload import build_sessions, percentiles
+from govmate.rules import load_rules
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_ready(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2)
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up in {timeout} s")
+
+
+def start_servers(n, port, db, extra):
+    cmd = [sys.executable, os.path.join(ROOT, "app.py"), "--production", "--host", "127.0.0.1",
+           "--processes", str(n), "--port", str(port)] + extra
+    proc = subprocess.Popen(cmd, cwd=ROOT, env={**os.environ, "GOVMATE_DB": db},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    urls = [f"http://127.0.0.1:{port + i}/" for i in range(n)]
+    for url in urls:
+        wait_ready(url)
+    return proc, urls
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--sessions", type=int, default=200)
+    ap.add_argument("--turns", type=int, default=6)
+    ap.add_argument("--concurrency", type=int, default=32, help="simulated users active at once")
+    ap.add_argument("--port", type=int, default=7900)
+    ap.add_argument("--server-args", default="", help="extra app.py flags, e.g. '--parse-workers 0'")
+    args = ap.parse_args()
+
+    variants = load_rules(os.path.join(ROOT, "rules.xlsx")).index.variants_by_event()
+    sessions = build_sessions(variants, list(variants), args.sessions, args.turns)
+    print(f"{len(sessions)} sessions, {sum(map(len, sessions))} turns, {args.concurrency} concurrent users, "
+          f"{os.cpu_count()} CPUs\n")
+    base = None
+    for n in args.processes:
+        with tempfile.TemporaryDirectory() as tmp:
+            proc, urls = start_servers(n, args.port, os.path.join(tmp, "scaling.db"), args.server_args.split())
+            try:
+                run_load(urls, sessions[:n], min(n, args.concurrency))  # warm every server
+                samples, _, errors, elapsed = run_load(urls, sessions, args.concurrency)
+            finally:
+                os.killpg(proc.pid, signal.SIGTERM)
+                proc.wait()
+        every = [ms for kind in samples for ms in samples[kind]]
+        pct = percentiles(every)
+        rate = len(every) / elapsed
+        base = base or rate
+        print(f"  {n} process{'es' if n > 1 else '  '}  {rate:8.1f} turns/s  x{rate / base:4.2f}   "
+              f"p50={pct[50]:7.1f} ms  p95={pct[95]:7.1f} ms  p99={pct[99]:7.1f} ms  failed={errors}")
+
+
+if __name__ == "__main__":
+    main()
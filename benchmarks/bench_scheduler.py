@@ -0,0 +1,93 @@
+"""Reminder scheduler at scale: heap operations, firing and iCalendar export.
+
+Fills a temporary SQLite store with ``--reminders`` reminders spread over
+``--users`` users and the next year, then times:
+
+* loading them all into the scheduler at start;
+* schedule (add), cancel (toggle done / delete) and re-schedule, per call;
+* firing a burst of reminders that fall due at once (the clock is moved
+  forward, so nothing waits on real time);
+* exporting one user's reminders as .ics.
+
+    python -m benchmarks.bench_scheduler [--reminders 50000] [--users 500]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.workload import percentiles
+from govmate.reminders import ReminderStore
+from govmate.scheduler import ReminderScheduler, to_ics
+
+
+def per_call(name, fn, args):
+    samples = []
+    for a in args:
+        t0 = time.perf_counter()
+        fn(*a)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    pct = percentiles(samples)
+    print(f"  {name:<22} n={len(samples):<6} p50={pct[50]:7.1f} us  p99={pct[99]:7.1f} us")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--reminders", type=int, default=50000)
+    ap.add_argument("--users", type=int, default=500)
+    ap.add_argument("--ops", type=int, default=5000)
+    ap.add_argument("--burst", type=int, default=1000, help="reminders due at the same minute")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    start = datetime.now().replace(second=0, microsecond=0) + timedelta(days=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ReminderStore(os.path.join(tmp, "bench.db"))
+        rows = []
+        for n in range(args.reminders):
+            due = start if n < args.burst else start + timedelta(minutes=rng.randrange(1, 525600))
+            rows.append((f"user-{n % args.users}", f"Reminder {n}", due.date().isoformat(),
+                         due.strftime("%H:%M") if n < args.burst or n % 4 else ""))
+        with store._conn() as conn:
+            conn.executemany("INSERT INTO reminders (user, title, date, time) VALUES (?, ?, ?, ?)", rows)
+
+        clock = [datetime.now()]
+        sched = ReminderScheduler(store, clock=lambda: clock[0])
+        t0 = time.perf_counter()
+        sched.load()
+        print(f"{len(sched)} reminders loaded in {(time.perf_counter() - t0) * 1000:.0f} ms\n")
+
+        ids = rng.sample(range(args.burst + 1, args.reminders + 1), 3 * args.ops)
+        day = lambda: (start + timedelta(days=rng.randrange(365))).date().isoformat()
+        print("Heap operations")
+        per_call("schedule (new)", sched.schedule,
+                 [(args.reminders + 1 + i, "user-0", day(), "10:00") for i in range(args.ops)])
+        per_call("schedule (move)", sched.schedule, [(i, "user-0", day(), "11:00") for i in ids[:args.ops]])
+        per_call("cancel", sched.cancel, [(i,) for i in ids[args.ops:2 * args.ops]])
+        per_call("toggle back", sched.on_change,
+                 [("toggle", f"user-{(i - 1) % args.users}", i) for i in ids[args.ops:2 * args.ops]])
+        print(f"  {len(sched)} live entries, {len(sched._heap)} in the heap\n")
+
+        fired = []
+        sched.sinks = [lambda user, r: fired.append(r["id"])]
+        clock[0] = start
+        sched.start()
+        t0 = time.perf_counter()
+        while len(fired) < args.burst and time.perf_counter() - t0 < 60:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - t0
+        sched.stop()
+        print(f"Burst: {len(fired)} reminders due at once fired in {elapsed * 1000:.0f} ms "
+              f"({len(fired) / elapsed:,.0f}/s, claim + fetch + sink each)\n")
+
+        user = "user-1"
+        t0 = time.perf_counter()
+        ics = to_ics(store.list(user))
+        print(f"ICS export: {ics.count('BEGIN:VEVENT')} reminders of {user}, {len(ics) / 1024:.0f} KiB "
+              f"in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Startup benchmark: module import time and rule-load time, reported separately.
+
+Every measurement runs in a fresh interpreter so nothing is already imported.
+Each import also lists the heavy dependencies it pulled in; the govmate modules
+(govmate.chat is the whole chat pipeline) should pull in none.
+Rule loading is timed twice: a cold compile from rules.xlsx (pandas + openpyxl)
+and a load from the warm binary cache.
+
+    python -m benchmarks.bench_startup [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTS = ["pandas", "openpyxl", "dateparser", "gradio", "govmate.rules", "govmate.chat", "govmate.batch"]
+HEAVY = ("pandas", "openpyxl", "dateparser", "gradio")
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import {mod}
+s = time.perf_counter() - t0
+print(json.dumps({{"s": s, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_LOAD_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import govmate.rules as r
+t1 = time.perf_counter()
+rules = r.{fn}({workbook!r}, {cache!r})
+t2 = time.perf_counter()
+print(json.dumps({{"import_s": t1 - t0, "s": t2 - t1, "pandas": "pandas" in sys.modules}}))
+"""
+
+
+def run(snippet):
+    out = subprocess.run([sys.executable, "-c", snippet], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def median_ms(results, key="s"):
+    return statistics.median(r[key] for r in results) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rules", default=os.path.join(ROOT, "rules.xlsx"))
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print("import time (fresh interpreter, median of %d)" % args.repeat)
+    for mod in IMPORTS:
+        res = [run(_IMPORT_SNIPPET.format(mod=mod, heavy=HEAVY)) for _ in range(args.repeat)]
+        print(f"  {mod:<14} {median_ms(res):9.1f} ms   loads: {', '.join(res[0]['heavy']) or '-'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "rules.cache.pkl")
+        cold = [run(_LOAD_SNIPPET.format(fn="compile_rules", workbook=args.rules, cache=cache))
+                for _ in range(args.repeat)]
+        warm = [run(_LOAD_SNIPPET.format(fn="load_rules", workbook=args.rules, cache=cache))
+                for _ in range(args.repeat)]
+
+    print("rule load (excluding the govmate.rules import)")
+    print(f"  xlsx compile   {median_ms(cold):9.1f} ms   (includes the lazy pandas import) pandas imported: {cold[0]['pandas']}")
+    print(f"  cache load     {median_ms(warm):9.1f} ms   pandas imported: {warm[0]['pandas']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Load generator for a running GovMate server.
+
+Each simulated user is a gradio_client session (so memory, pending date and
+reminder owner stay per user, as in a browser tab) replaying one conversation
+from benchmarks/workload.py against the ``/chat`` endpoint. ``--concurrency``
+users are active at a time; latency is measured per turn on the client, both
+to the first streamed chunk of the reply and to the complete reply.
+Given several ``--url``s, sessions are spread over them round-robin and each
+sticks to its server, as behind a sticky proxy.
+
+    python app.py                                   # in another terminal
+    python -m benchmarks.loadgen --url http://127.0.0.1:7860 --sessions 200 --concurrency 16
+
+Reminders saved by the run land in the server's database.
+"""
+import argparse
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.workload import build_sessions, format_row
+from govmate.rules import load_rules
+
+
+def run_session(url, convo):
+    """Replay one conversation; returns ([(kind, first-chunk ms, total ms)], errors)."""
+    from gradio_client import Client
+    client = Client(url, verbose=False)
+    user, out, errors = None, [], 0
+    for kind, text in convo:
+        t0 = time.perf_counter()
+        first = None
+        try:
+            job = client.submit(text, user, api_name="/chat")
+            for _ in job:
+                if first is None:
+                    first = (time.perf_counter() - t0) * 1000
+            _, user = job.result()
+        except Exception:
+            errors += 1
+            continue
+        total = (time.perf_counter() - t0) * 1000
+        out.append((kind, first or total, total))
+    return out, errors
+
+
+def run_load(urls, sessions, concurrency):
+    """Replay ``sessions`` against ``urls``; returns (kind -> ms samples, kind -> first-chunk
+    ms samples, failed turns, wall seconds)."""
+    samples, first, errors, lock = defaultdict(list), defaultdict(list), 0, threading.Lock()
+
+    def worker(n):
+        nonlocal errors
+        timings, failed = run_session(urls[n % len(urls)], sessions[n])
+        with lock:
+            errors += failed
+            for kind, first_ms, ms in timings:
+                first[kind].append(first_ms)
+                samples[kind].append(ms)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, range(len(sessions))))
+    return samples, first, errors, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--url", nargs="+", default=["http://127.0.0.1:7860/"])
+    ap.add_argument("--sessions", type=int, default=100)
+    ap.add_argument("--turns", type=int, default=6)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--rules", default="rules.xlsx")
+    args = ap.parse_args()
+
+    variants = load_rules(args.rules).index.variants_by_event()
+    sessions = build_sessions(variants, list(variants), args.sessions, args.turns, args.seed)
+    print(f"{len(sessions)} sessions, {sum(map(len, sessions))} turns, "
+          f"concurrency {args.concurrency}, target {' '.join(args.url)}\n")
+    samples, first, errors, elapsed = run_load(args.url, sessions, args.concurrency)
+
+    print("first chunk")
+    for kind in sorted(first):
+        print("  " + format_row(kind, first[kind]))
+    print("  " + format_row("all turns", [ms for kind in first for ms in first[kind]]))
+    print("complete reply")
+    every = [ms for kind in samples for ms in samples[kind]]
+    for kind in sorted(samples):
+        print("  " + format_row(kind, samples[kind]))
+    print("  " + format_row("all turns", every, elapsed))
+    print(f"\n{elapsed:.1f} s wall, {errors} failed turns")
+
+
+if __name__ == "__main__":
+    main()
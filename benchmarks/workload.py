@@ -0,0 +1,96 @@
+"""Synthetic chat traffic shared by the pipeline benchmark and the load generator.
+
+A session is a list of ``(kind, message)`` turns that a user could plausibly
+type: a life-event message for each event_key the bot knows, some with a date
+(followed by a "yes" to save it), explicit reminder commands, date-only and
+off-topic messages. Everything is drawn from a seeded ``random.Random`` so runs
+are repeatable.
+"""
+import random
+
+EVENT_TEMPLATES = (
+    "{v}",
+    "hi, {v}",
+    "{v} - what do I need to do?",
+    "we {v} and I'm not sure where to start",
+    "Just wondering, {v}. Any tips?",
+)
+DATE_PHRASES = (
+    "on 2025-10-01", "tomorrow", "next friday", "on 12 October", "at 9am",
+    "by 31/10/2025", "today at 14:30", "in two weeks", "on the 15th", "3 March 2026",
+)
+REMINDER_COMMANDS = (
+    "remind me on 2025-09-10 at 09:00 to lodge my return",
+    "remind me tomorrow at 9am to call Services Australia",
+    "set a reminder next monday to update my TFN declaration",
+    "remind me on 1 November to check my super",
+    "save to calendar 2025-12-01 to submit the BAS",
+)
+DATE_ONLY = (
+    "my appointment is on 2025-11-04", "next tuesday at 10am", "the deadline is 31 October",
+    "tomorrow", "what about 20/09/2025?",
+)
+OFF_TOPIC = (
+    "thanks!", "hello", "what can you do?", "is it going to rain", "ok cool", "how are you",
+)
+YES = ("yes", "ok", "sure", "save it")
+
+# How often each turn kind starts a step of a session.
+MIX = (("event", 50), ("event_date", 15), ("reminder", 10), ("date_only", 10), ("off_topic", 15))
+
+
+def event_message(rng, variants):
+    return rng.choice(EVENT_TEMPLATES).format(v=rng.choice(variants))
+
+
+def session(rng, variants_by_event, events, turns=6):
+    """One user's conversation: ``turns`` steps, a date step may add a "yes"."""
+    kinds, weights = zip(*MIX)
+    out = []
+    for _ in range(turns):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "event":
+            out.append((kind, event_message(rng, variants_by_event[rng.choice(events)])))
+        elif kind == "event_date":
+            msg = event_message(rng, variants_by_event[rng.choice(events)])
+            out.append((kind, f"{msg} {rng.choice(DATE_PHRASES)}"))
+            out.append(("yes", rng.choice(YES)))
+        elif kind == "reminder":
+            out.append((kind, rng.choice(REMINDER_COMMANDS)))
+        elif kind == "date_only":
+            out.append((kind, rng.choice(DATE_ONLY)))
+            out.append(("yes", rng.choice(YES)))
+        else:
+            out.append((kind, rng.choice(OFF_TOPIC)))
+    return out
+
+
+def build_sessions(variants_by_event, events, sessions=200, turns=6, seed=0):
+    """``sessions`` conversations; every event in ``events`` opens at least one."""
+    rng = random.Random(seed)
+    events = [e for e in events if variants_by_event.get(e)]
+    out = []
+    for i in range(sessions):
+        convo = session(rng, variants_by_event, events, turns)
+        if i < len(events):
+            convo.insert(0, ("event", event_message(rng, variants_by_event[events[i]])))
+        out.append(convo)
+    return out
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of ``samples`` as ``{p: value}``."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {p: 0.0 for p in points}
+    return {p: ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+            for p in points}
+
+
+def format_row(name, samples_ms, elapsed_s=None):
+    """One report line; the rate is calls per wall second, or per busy second
+    of a single caller when ``elapsed_s`` is not given."""
+    pct = percentiles(samples_ms)
+    rate = len(samples_ms) / elapsed_s if elapsed_s else len(samples_ms) / (sum(samples_ms) / 1000 or 1)
+    return (f"{name:<24} n={len(samples_ms):<6} p50={pct[50]:8.3f} ms  p95={pct[95]:8.3f} ms  "
+            f"p99={pct[99]:8.3f} ms  {rate:10.0f} /s")
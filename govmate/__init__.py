@@ -0,0 +1 @@
+"""Core logic for the MyGovMate chatbot (keyword matching, answers, reminders)."""
@@ -0,0 +1,177 @@
+"""Offline triage: classify every message of a CSV/JSONL/text export.
+
+Messages stream through the same keyword index and event ranking as the
+chatbot, one line of output per input line: the top-ranked event, the keywords
+that matched and any date/time found. Input is read lazily and results are written as
+they come back, so memory stays bounded by ``workers * chunk_size`` messages
+however large the file is.
+
+    python -m govmate.batch transcripts.csv --column text -o triage.jsonl --workers 4
+    python -m govmate.batch survey.jsonl --field answer -o triage.csv --no-dates
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from govmate.dates import date_cache_key, parse_datetime
+from govmate.fuzzy import with_fuzzy
+from govmate.memo import TTLCache
+from govmate.rules import load_rules
+
+FIELDS = ("id", "event", "keywords", "date", "time")
+
+
+def _format_of(path, fmt=None):
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(ext, "text")
+
+
+def read_messages(f, fmt="text", column="text", id_column=None):
+    """Yield ``(id, text)`` for each record of an open file; ids default to the line number."""
+    if fmt == "csv":
+        for n, row in enumerate(csv.DictReader(f), 1):
+            yield (row.get(id_column) if id_column else n), row.get(column) or ""
+    elif fmt == "jsonl":
+        for n, line in enumerate(f, 1):
+            if line.strip():
+                obj = json.loads(line)
+                yield (obj.get(id_column) if id_column else n), str(obj.get(column) or "")
+    else:
+        for n, line in enumerate(f, 1):
+            yield n, line.rstrip("\r\n")
+
+
+class Classifier:
+    """Keyword event + dates for one message, against one rule snapshot."""
+
+    def __init__(self, rules, dates=True, now=None, cache_size=4096, fuzzy=False):
+        self.rules = rules
+        self.dates = dates
+        self.fuzzy = fuzzy
+        self.now = now or datetime.now()
+        self._date_cache = TTLCache(cache_size)
+
+    def parse_dates(self, text):
+        key = date_cache_key(text, self.now)
+        if key is None:
+            return parse_datetime(text, self.now)
+        return self._date_cache.get_or_compute(key, lambda: parse_datetime(text, self.now))
+
+    def __call__(self, rid, text):
+        hits, weights = self.rules.index.search(text), None
+        if self.fuzzy:
+            hits, weights = with_fuzzy(hits, self.rules.fuzzy, text)
+        ranked = self.rules.ranker.rank(hits, weights, k=1)
+        event, _, selected = ranked[0] if ranked else (None, 0.0, [])
+        keywords = list(dict.fromkeys(v for *_, matched in selected for v in matched))
+        d, t = self.parse_dates(text) if self.dates else (None, None)
+        return {"id": rid, "event": event, "keywords": keywords, "date": d, "time": t}
+
+
+_worker = None
+
+
+def _init_worker(rules_path, dates, now, fuzzy):
+    global _worker
+    _worker = Classifier(load_rules(rules_path), dates, now, fuzzy=fuzzy)
+
+
+def _classify_chunk(chunk):
+    return [_worker(rid, text) for rid, text in chunk]
+
+
+def classify_stream(records, rules_path="rules.xlsx", workers=0, chunk_size=1000, dates=True, now=None,
+                    fuzzy=False):
+    """Classify ``(id, text)`` records lazily, in input order.
+
+    With ``workers > 1`` chunks go to a process pool; at most ``2 * workers``
+    chunks are in flight, so a slow consumer never makes the input pile up.
+    """
+    now = now or datetime.now()
+    if workers <= 1:
+        classify = Classifier(load_rules(rules_path), dates, now, fuzzy=fuzzy)
+        for rid, text in records:
+            yield classify(rid, text)
+        return
+
+    load_rules(rules_path)  # refresh a stale cache once here, not in every worker
+    records = iter(records)
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(rules_path, dates, now, fuzzy)) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_classify_chunk, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def write_results(results, f, fmt="jsonl"):
+    """Write results as they arrive; returns ``(count, Counter of events)``."""
+    events = Counter()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writeheader()
+    n = 0
+    for n, r in enumerate(results, 1):
+        events[r["event"]] += 1
+        if writer:
+            writer.writerow({**r, "event": r["event"] or "", "keywords": "; ".join(r["keywords"]),
+                             "date": r["date"] or "", "time": r["time"] or ""})
+        else:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    return n, events
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Classify a message export into life events.")
+    ap.add_argument("input", help="CSV, JSONL or plain-text file (one message per line); - for stdin")
+    ap.add_argument("-o", "--output", default="-", help="output .jsonl or .csv (default: JSONL on stdout)")
+    ap.add_argument("--format", choices=("csv", "jsonl", "text"), help="input format (default: from extension)")
+    ap.add_argument("--column", "--field", dest="column", default="text", help="CSV column / JSON field with the message")
+    ap.add_argument("--id-column", default=None, help="column / field to copy as the id (default: line number)")
+    ap.add_argument("--rules", default="rules.xlsx")
+    ap.add_argument("--workers", type=int, default=0, help="processes (default: classify in this process)")
+    ap.add_argument("--chunk-size", type=int, default=1000)
+    ap.add_argument("--no-dates", action="store_true", help="skip date extraction")
+    ap.add_argument("--fuzzy", action="store_true", help="also match keywords with typos or other inflections")
+    args = ap.parse_args(argv)
+
+    fin = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    out_fmt = "csv" if args.output.lower().endswith(".csv") else "jsonl"
+    t0 = time.perf_counter()
+    try:
+        records = read_messages(fin, _format_of(args.input, args.format), args.column, args.id_column)
+        results = classify_stream(records, args.rules, args.workers, args.chunk_size, not args.no_dates,
+                                  fuzzy=args.fuzzy)
+        n, events = write_results(results, fout, out_fmt)
+    finally:
+        for f in (fin, fout):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+    elapsed = time.perf_counter() - t0
+
+    print(f"{n} messages in {elapsed:.1f} s ({n / elapsed if elapsed else 0:,.0f}/s)", file=sys.stderr)
+    matched = n - events.pop(None, 0)
+    print(f"matched {matched} ({100 * matched / n if n else 0:.1f}%)", file=sys.stderr)
+    for event, count in events.most_common():
+        print(f"  {event:<34} {count}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Windowed Markdown views of a user's reminders for the 📅 tab."""
+import weakref
+from datetime import date as _date, timedelta
+
+from govmate.memo import TTLCache
+
+PAGE_SIZE = 50
+VIEWS = ("All", "Upcoming", "Overdue")
+
+# Rendered "### <date>" groups, one cache per ReminderStore. A group's text
+# depends only on which reminders it holds and their done flags (titles, dates
+# and times are never edited and a store never reuses an id), so that is the
+# key: a change re-renders just the groups whose membership or flags moved, and
+# no invalidation is needed. Ids are only unique within one database, so
+# another store (or a recreated file) gets its own cache.
+_groups = weakref.WeakKeyDictionary()
+
+
+def _group_cache(store):
+    cache = _groups.get(store)
+    if cache is None:
+        cache = _groups.setdefault(store, TTLCache(maxsize=4096))
+    return cache
+
+
+def render_group(d, tasks):
+    lines = [f"### {d}"]
+    for t in tasks:
+        status = "✅ Done" if t.get("done") else "⏳ Pending"
+        time_part = f" {t['time']}" if t.get("time") else ""
+        lines.append(f"- [{status}] **{t.get('title','(no title)')}** —{time_part}")
+    return "\n".join(lines)
+
+
+def render_tasks(tasks, cache=None):
+    """Markdown list grouped by date; ``tasks`` come pre-ordered from ReminderStore.
+
+    ``cache`` (a TTLCache for the store the tasks came from) reuses rendered groups.
+    """
+    by_date = {}
+    for t in tasks:
+        by_date.setdefault(t.get("date") or "(no date)", []).append(t)
+    parts = []
+    for d in sorted(by_date):
+        group = by_date[d]
+        if cache is None:
+            parts.append(render_group(d, group))
+            continue
+        key = (d, tuple((t["id"], bool(t.get("done"))) for t in group))
+        parts.append(cache.get_or_compute(key, lambda: render_group(d, group)))
+    return "\n".join(parts)
+
+
+def view_filters(view, start="", end="", today=None):
+    """Store query filters for a view name plus an optional inclusive date range."""
+    today = today or _date.today()
+    filters = {"start": start or None, "end": end or None, "done": None}
+    if view == "Upcoming":
+        # Pending, dated, from today on; undated reminders sort as 9999-12-31.
+        first = today.isoformat()
+        filters.update(done=False, start=max(first, start or first), end=end or "9999-12-30")
+    elif view == "Overdue":
+        last = (today - timedelta(days=1)).isoformat()
+        filters.update(done=False, end=min(last, end or last))
+    return filters
+
+
+def calendar_page(store, user, view="All", start="", end="", page=1, page_size=PAGE_SIZE, today=None):
+    """One page of a view: ``(markdown, tasks_on_page, page, pages)``."""
+    filters = view_filters(view, start, end, today)
+    total = store.count(user, **filters) if user else 0
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, int(page or 1)), pages)
+    if not total:
+        empty = view == "All" and not (start or end)
+        return ("No reminders yet." if empty else "No reminders in this view."), [], page, pages
+    tasks = store.query(user, limit=page_size, offset=(page - 1) * page_size, **filters)
+    first = (page - 1) * page_size + 1
+    header = f"_{first}–{first + len(tasks) - 1} of {total} · page {page}/{pages}_\n\n" if pages > 1 else ""
+    return header + render_tasks(tasks, _group_cache(store)), tasks, page, pages
@@ -0,0 +1,387 @@
+"""The chat pipeline without the UI: reminder commands, keyword matching, answer
+composition and date prompts for one message.
+
+Importing this module is cheap: gradio is never imported, pandas only when
+rules.xlsx has to be recompiled and dateparser only when a date phrase needs
+it. The rules watcher and the reminder database are opened on first use.
+"""
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+
+from govmate import metrics
+from govmate.dates import date_cache_key, parse_datetime as _parse_datetime
+from govmate.fuzzy import with_fuzzy
+from govmate.memo import TTLCache
+from govmate.reload import RulesWatcher
+from govmate.reminders import ReminderStore
+from govmate.scheduler import BannerSink, LogSink, ReminderScheduler, WebhookSink
+
+RULES_PATH = "rules.xlsx"
+# Typo- and inflection-tolerant keyword matching (govmate.fuzzy); off by default.
+FUZZY = os.environ.get("GOVMATE_FUZZY", "").lower() in ("1", "true", "yes", "on")
+# Secondary events shown under "Also relevant" (0: answer one topic only), and
+# the share of the top event's score they need to be shown at all.
+ALSO_RELEVANT = int(os.environ.get("GOVMATE_ALSO_RELEVANT", 2))
+ALSO_MIN_SHARE = 0.3
+ALSO_BULLETS = 2
+
+_lock = threading.Lock()
+_watcher = None
+_store = None
+_scheduler = None
+_banner = None
+
+
+def rules_watcher() -> RulesWatcher:
+    """The process-wide RulesWatcher, started on first use.
+
+    Keyword index + pre-rendered answers, loaded from rules.xlsx.cache.pkl when it
+    is fresh; rules.xlsx is only re-parsed (with pandas) after it changes. The
+    watcher picks up edits to the workbook while the server is running.
+    """
+    global _watcher
+    if _watcher is None:
+        with _lock:
+            if _watcher is None:
+                watcher = RulesWatcher(RULES_PATH, on_reload=[drop_answers, warm_fragments])
+                warm_fragments(watcher.rules)
+                _watcher = watcher.start()
+    return _watcher
+
+
+def reminder_store() -> ReminderStore:
+    """The process-wide ReminderStore: one SQLite file per deployment, so
+    reminders survive refreshes and restarts."""
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = ReminderStore(os.environ.get("GOVMATE_DB", "govmate.db"))
+    return _store
+
+
+def reminder_banner() -> BannerSink:
+    """Due reminders waiting to be shown in each user's browser (see app.py).
+
+    The sink holds no state of its own, so a racing second instance is harmless
+    and no lock is taken (reminder_scheduler builds its sinks under ``_lock``).
+    """
+    global _banner
+    if _banner is None:
+        _banner = BannerSink(reminder_store())
+    return _banner
+
+
+def reminder_sinks():
+    """Sinks named in GOVMATE_REMINDER_SINKS (comma-separated: log, banner, webhook)."""
+    sinks = []
+    for name in os.environ.get("GOVMATE_REMINDER_SINKS", "log,banner").split(","):
+        name = name.strip()
+        if name == "log":
+            sinks.append(LogSink())
+        elif name == "banner":
+            sinks.append(reminder_banner())
+        elif name == "webhook":
+            url = os.environ.get("GOVMATE_REMINDER_WEBHOOK")
+            if not url:
+                raise ValueError("GOVMATE_REMINDER_SINKS has webhook but GOVMATE_REMINDER_WEBHOOK is not set")
+            sinks.append(WebhookSink(url))
+        elif name:
+            raise ValueError(f"Unknown reminder sink {name!r}")
+    return sinks
+
+
+def reminder_scheduler() -> ReminderScheduler:
+    """The process-wide ReminderScheduler over reminder_store(); call ``start()``
+    to load the pending reminders and begin firing them."""
+    global _scheduler
+    if _scheduler is None:
+        store = reminder_store()
+        with _lock:
+            if _scheduler is None:
+                _scheduler = ReminderScheduler(store, reminder_sinks())
+    return _scheduler
+
+# Memo caches for the pure per-message stages (sizes and TTLs in entries/seconds).
+answer_cache = TTLCache(maxsize=int(os.environ.get("GOVMATE_ANSWER_CACHE_SIZE", 2048)),
+                        ttl=float(os.environ.get("GOVMATE_ANSWER_CACHE_TTL", 3600)))
+date_cache = TTLCache(maxsize=int(os.environ.get("GOVMATE_DATE_CACHE_SIZE", 2048)),
+                      ttl=float(os.environ.get("GOVMATE_DATE_CACHE_TTL", 3600)))
+# Rendered answer sections, shared by every message that matches the same rows.
+fragment_cache = TTLCache(maxsize=int(os.environ.get("GOVMATE_FRAGMENT_CACHE_SIZE", 1024)))
+
+def cache_stats():
+    return {"answers": answer_cache.stats(), "dates": date_cache.stats(),
+            "fragments": fragment_cache.stats()}
+
+metrics.REGISTRY.collect(lambda: [(f"cache_{k}", {"cache": name}, v)
+                                  for name, st in cache_stats().items()
+                                  for k, v in st.items() if k not in ("maxsize", "ttl")])
+
+@metrics.timed("parse_datetime")
+def parse_datetime(text: str):
+    now = datetime.now()
+    key = date_cache_key(text, now)
+    if key is None:
+        return _parse_datetime(text, now)
+    return date_cache.get_or_compute(key, lambda: _parse_datetime(text, now))
+
+CAL_YES = {"yes","y","ok","okay","sure","save","save it","please save"}
+
+@metrics.timed("parse_calendar_command")
+def parse_calendar_command(text: str):
+    if not text:
+        return None, None, None
+    if re.search(r"\b(remind me|set (a )?reminder|save (it )?to (the )?calendar)\b", text, flags=re.I):
+        parts = re.split(r"\s+to\s+", text, maxsplit=1, flags=re.I)
+        date_part = parts[0]
+        title = parts[1].strip() if len(parts) > 1 and parts[1].strip() else "Tax reminder"
+        d, t = parse_datetime(date_part)
+        return title, d, t
+    return None, None, None
+
+@metrics.timed("match_keywords")
+def match_keywords(user_text: str, rules=None, fuzzy=None):
+    """Keyword hits plus their ranking weights (None: all exact).
+    With fuzzy matching on, rows matched only despite a typo or an inflection
+    are added, weighted by how close the match was."""
+    rules = rules or rules_watcher().rules
+    hits = rules.index.search(user_text)
+    if FUZZY if fuzzy is None else fuzzy:
+        return with_fuzzy(hits, rules.fuzzy, user_text)
+    return hits, None
+
+def rank_events(user_text: str, rules=None, k=None):
+    """``[(event_key, score, hits)]`` for the best ``k`` events (default: the
+    top one plus ALSO_RELEVANT), best first."""
+    rules = rules or rules_watcher().rules
+    return rules.ranker.rank(*match_keywords(user_text, rules), k=k or 1 + ALSO_RELEVANT)
+
+def split_ranked(ranked):
+    """Primary hits, primary event and ``[(event_key, hits)]`` worth an
+    "Also relevant" section."""
+    if not ranked:
+        return [], None, []
+    (event, top, hits), rest = ranked[0], ranked[1:]
+    return hits, event, [(ev, h) for ev, score, h in rest if score >= ALSO_MIN_SHARE * top]
+
+def render_sources(records):
+    seen = set()
+    lines = ["**Sources:**"]
+    for r in records:
+        if r.source_url and r.source_url not in seen:
+            lines.append(r.source_line)
+            seen.add(r.source_url)
+    return "\n".join(lines) if seen else ""
+
+FRIENDLY_INTRO = {
+    "newborn_baby": "Congratulations on your new baby! 🎉 Let’s make the admin side feel easy.",
+    "new_baby_documents": "Congrats on your little one! 👶 Here’s a tidy checklist for the paperwork.",
+    "new_baby_income_check": "Happy news! With a new baby, a few money and tax settings are worth checking.",
+    "starting_new_job": "Congrats on the new role! 👔 I’ll help you zip through the onboarding.",
+    "redundancy_jobseeker": "I’m sorry to hear about the redundancy 💼 — here’s a practical plan to move forward.",
+    "redundancy_actions": "Let’s sort your payout, tax, and next steps after redundancy.",
+    "contractor_start": "Exciting shift to contracting! 🚀 Here’s how to set it up cleanly.",
+    "sole_trader_setup": "Going sole trader? Here’s the simple path to get started.",
+    "start_business_overview": "Starting a business — great! Here’s the one-page playbook.",
+    "small_business_setup": "Small business setup — we’ll keep it simple and compliant.",
+    "citizenship_tax": "Congrats on becoming an Australian citizen! 🇦🇺 A few tax settings might change.",
+    "disaster_recovery_support": "That sounds really tough. Here’s the official help available right now.",
+    "departing_australia_super": "Leaving Australia? Let’s check your super (DASP) and how tax works.",
+    "family_domestic_violence_support": "You’re not alone. Here are confidential supports and payments that can help.",
+    "first_home_temp_visa": "First home on a temporary visa? Here’s what to know early.",
+    "work_related_deductions": "Doing your tax? Here’s a quick guide to common work-related deductions.",
+    "graduate_job_search": "Fresh graduate — nice! Here are free tools and programs to land that first role.",
+}
+
+def pretty_event_title(ev_key: str) -> str:
+    mapping = {
+        "newborn_baby": "New baby — what to do next",
+        "new_baby_documents": "New baby — documents & registrations",
+        "new_baby_income_check": "New baby — payments & income checks",
+        "starting_new_job": "Starting a new job",
+        "redundancy_jobseeker": "Redundancy — JobSeeker & support",
+        "redundancy_actions": "Redundancy — tax & admin",
+        "contractor_start": "Starting as a contractor",
+        "sole_trader_setup": "Sole trader setup",
+        "start_business_overview": "Starting a business — overview",
+        "small_business_setup": "Small business setup",
+        "citizenship_tax": "Citizenship — tax settings",
+        "disaster_recovery_support": "Disaster recovery support",
+        "departing_australia_super": "Departing Australia — super (DASP)",
+        "family_domestic_violence_support": "Family & domestic violence support",
+        "first_home_temp_visa": "First home on a temporary visa",
+        "work_related_deductions": "Work-related deductions",
+        "graduate_job_search": "Graduate — job search",
+    }
+    return mapping.get(ev_key, "Here’s a quick plan")
+
+def _render_fragment(event_key, row_ids, rules, primary):
+    rows = [rules.store[i] for i in sorted(row_ids)]
+    if primary:
+        intro = FRIENDLY_INTRO.get(event_key, "Here’s a simple checklist to help you move forward.")
+        head = f"{intro}\n\n**{pretty_event_title(event_key)}**\n\n"
+        return head, "\n".join(r.bullet for r in rows if r.bullet), tuple(rows)
+    rows = [r for r in rows if r.bullet][:ALSO_BULLETS]
+    if not rows:
+        return "", "", ()
+    body = f"\n\n**Also relevant: {pretty_event_title(event_key)}**\n\n" + "\n".join(r.bullet for r in rows)
+    return "", body, tuple(rows)
+
+def event_fragment(event_key, row_ids, rules, primary=True):
+    """``(head, body, records shown)`` for one event's section of an answer: the
+    intro and heading, then the bullets, of the main topic, or an "Also
+    relevant" section (all body)."""
+    key = (rules, event_key, frozenset(row_ids), primary)
+    return fragment_cache.get_or_compute(key, lambda: _render_fragment(event_key, row_ids, rules, primary))
+
+def drop_answers(rules):
+    """Reload hook: answers are keyed on the RuleSet they came from, so none
+    cached for an earlier snapshot can be served again."""
+    answer_cache.clear()
+
+def warm_fragments(rules):
+    """Drop the fragments of earlier rule snapshots and pre-render both
+    sections for the rows each keyword variant matches on its own."""
+    fragment_cache.clear()
+    for variants in rules.index.variants_by_event().values():
+        for v in variants:
+            for ev, _, hits in rules.ranker.top(rules.index.search(v), k=1):  # untimed: not a chat turn
+                row_ids = frozenset(h[0] for h in hits)
+                for primary in (True, False):
+                    fragment_cache.set((rules, ev, row_ids, primary),
+                                       _render_fragment(ev, row_ids, rules, primary))
+
+@metrics.timed("compose_answer")
+def compose_answer_parts(selected_hits, show_debug=False, rules=None, also=()):
+    """``compose_answer_from_rows`` split in two: the intro and heading, which
+    can be shown first, and everything after them."""
+    if not selected_hits:
+        return "I couldn’t recognise a relevant topic yet.", ""
+
+    rules = rules or rules_watcher().rules
+    head, body, shown = event_fragment(selected_hits[0][1], [h[0] for h in selected_hits], rules)
+    parts = [body]
+    shown = list(shown)
+    for ev, hits in also:
+        _, body, rows = event_fragment(ev, [h[0] for h in hits], rules, primary=False)
+        parts.append(body)
+        shown += rows
+
+    src_md = render_sources(shown)
+    if src_md:
+        parts.append("\n\n" + src_md)
+
+    if show_debug:
+        # Which variants matched differs per message, so this line is never cached.
+        matched = {h[0]: h[3] for h in selected_hits}
+        matched.update((h[0], h[3]) for _, hits in also for h in hits)
+        dbg = [f"`{r.keyword_key}` ⇢ {', '.join(matched[r.idx])}" for r in shown]
+        parts.append("\n\n_" + " | ".join(dbg) + "_")
+
+    parts.append("\n\nIf you’d like, I can save a reminder for any dates or deadlines — "
+                 "just say something like *“remind me on 2025-09-10 at 09:00 to lodge my return”*.")
+
+    return head, "".join(parts)
+
+def compose_answer_from_rows(selected_hits, show_debug=False, rules=None, also=()):
+    """The answer for the primary event's hits, followed by a short section
+    (heading + first ALSO_BULLETS bullets) for each ``(event_key, hits)`` in ``also``."""
+    return "".join(compose_answer_parts(selected_hits, show_debug, rules, also))
+
+def match_and_answer(text, show_debug, rules):
+    """Keyword matching, event selection and the composed answer (as
+    ``compose_answer_parts``) for one message, memoized on the lowered text, the
+    debug flag and the rule snapshot."""
+    def compute():
+        selected_hits, chosen_event, also = split_ranked(rank_events(text, rules))
+        parts = compose_answer_parts(selected_hits, show_debug=show_debug, rules=rules, also=also)
+        return selected_hits, chosen_event, parts
+    return answer_cache.get_or_compute((text.lower(), show_debug, rules), compute)
+
+def _respond(message, memory_events, show_debug, user, pending):
+    """One chat turn as a generator of ``(reply so far, memory_events, user, pending)``.
+
+    A keyword answer comes out in steps: the intro and heading, then the whole
+    answer, then the answer with the "Save to calendar?" prompt once the date
+    parse (the slowest stage) is done. Session state is final from the first
+    step on, except ``pending``, which only the last step can set.
+    """
+    if not (message and str(message).strip()):
+        yield "Please type something so I can help 🙂", memory_events, user, pending
+        return
+
+    text = message.strip()
+    user = user or uuid.uuid4().hex
+
+    if pending and text.lower() in CAL_YES:
+        reminder_store().add(user, pending.get("title","Tax reminder"), pending.get("date",""),
+                           pending.get("time",""), pending.get("notes",""))
+        saved = pending
+        pending = None
+        date_show = saved.get("date","(no date)")
+        time_show = (" " + saved["time"]) if saved.get("time") else ""
+        reply = f"✅ Saved to calendar: **{saved.get('title','Reminder')}** — {date_show}{time_show}\n\nYou can open the 📅 tab any time to view or edit."
+        yield reply, memory_events, user, pending
+        return
+
+    title_cmd, date_cmd, time_cmd = parse_calendar_command(text)
+    if title_cmd and (date_cmd or time_cmd):
+        new_task = reminder_store().add(user, title_cmd, date_cmd or "", time_cmd or "")
+        ds = new_task["date"] or "(no date)"
+        ts = (" " + new_task["time"]) if new_task["time"] else ""
+        reply = f"✅ Saved to calendar: **{new_task['title']}** — {ds}{ts}\n\nI’ve added it to your reminders. You can manage it in the 📅 tab."
+        yield reply, memory_events, user, None
+        return
+    elif title_cmd or date_cmd or time_cmd:
+        yield ("I can save that, but I need a date or time (e.g., **2025-09-10 09:00**). "
+               "Try: *remind me on 2025-09-10 at 09:00 to lodge my tax return*."), memory_events, user, pending
+        return
+
+    rules = rules_watcher().rules  # one snapshot for the whole turn, even if a reload lands mid-way
+    selected_hits, chosen_event, (head, rest) = match_and_answer(text, bool(show_debug), rules)
+
+    if chosen_event:
+        metrics.inc("event_matches", event_key=chosen_event)
+    else:
+        metrics.inc("unmatched_messages")
+
+    if not selected_hits and not memory_events:
+        date_hint, time_hint = parse_datetime(text)
+        if date_hint or time_hint:
+            pending = {"title": "Tax reminder", "date": date_hint or "", "time": time_hint or "", "notes": ""}
+            ask = f"\n\n📅 I found a date {date_hint or ''} {time_hint or ''}. Save to calendar? (reply **yes** to confirm)"
+            yield "I couldn’t recognise a keyword yet." + ask, memory_events, user, pending
+            return
+        yield ("I’m not sure I caught the topic 🤔. "
+               "Try something like *“we just had a baby”*, *“I’m starting a new job”*, or *“I was made redundant”*."), memory_events, user, pending
+        return
+
+    if chosen_event and chosen_event not in memory_events:
+        memory_events.append(chosen_event)
+
+    reply = head + rest
+    if rest:
+        yield head, memory_events, user, pending
+    yield reply, memory_events, user, pending
+
+    date_hint, time_hint = parse_datetime(text)
+    if date_hint or time_hint:
+        pending = {"title": "Tax reminder", "date": date_hint or "", "time": time_hint or "", "notes": ""}
+        reply += f"\n\n📅 I noticed a date {date_hint or ''} {time_hint or ''}. Save to calendar? (reply **yes** to confirm)"
+        yield reply, memory_events, user, pending
+
+@metrics.entry("chatbot_response")
+def chatbot_response(message, history, memory_events, show_debug, user, pending):
+    for out in _respond(message, memory_events, show_debug, user, pending):
+        pass
+    return out
+
+@metrics.entry("chatbot_response_stream")
+def chatbot_response_stream(message, history, memory_events, show_debug, user, pending):
+    """``chatbot_response`` for gr.ChatInterface streaming: yields the reply as
+    it grows, each time with the session state outputs."""
+    yield from _respond(message, memory_events, show_debug, user, pending)
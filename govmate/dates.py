@@ -0,0 +1,263 @@
+"""Date/time extraction for chat messages.
+
+``parse_datetime`` tries, in order: ISO and d/m/Y dates, a hand-written
+resolver for the common phrasings (``resolve_common``), and only then
+``dateparser.search.search_dates``, which is imported lazily because it is
+by far the slowest step of a chat turn.
+
+The resolver never invents a new interpretation: with the strict settings
+below, dateparser resolves "today"/"tomorrow"/"yesterday" but returns nothing
+for bare weekdays, "next friday", "3 march" or "9am", and the resolver gives
+exactly those answers. Anything outside its small grammar is left to
+dateparser (see benchmarks/bench_dates.py for the golden corpus).
+
+``start_parse_pool`` moves those dateparser calls into worker processes, so a
+slow parse waits off the server's GIL instead of stalling other sessions.
+"""
+import logging
+import re
+from concurrent.futures import BrokenExecutor
+from datetime import datetime, timedelta
+
+from govmate import metrics
+
+log = logging.getLogger(__name__)
+
+SEARCH_SETTINGS = {
+    "RETURN_AS_TIMEZONE_AWARE": False,
+    "PREFER_DATES_FROM": "future",
+    "STRICT_PARSING": True,
+    "SKIP_TOKENS": ["to","ok","okay","save","calendar","i","am","please"]
+}
+
+
+def _extract_time(text: str) -> str:
+    """Return HH:MM from '09:30' or '9am/9 pm'. Empty string if none."""
+    m = re.search(r"\b([01]?\d|2[0-3]):([0-5]\d)\b", text)
+    if m:
+        return f"{m.group(1).zfill(2)}:{m.group(2)}"
+    m = re.search(r"\b([1-9]|1[0-2])\s*(am|pm)\b", text, flags=re.I)
+    if m:
+        h = int(m.group(1)); ampm = m.group(2).lower()
+        if ampm == "pm" and h != 12: h += 12
+        if ampm == "am" and h == 12: h = 0
+        return f"{h:02d}:00"
+    return ""
+
+DATE_HINT = (
+    r"(\b\d{4}-\d{2}-\d{2}\b|"                 # 2025-09-10
+    r"\b\d{1,2}/\d{1,2}/\d{2,4}\b|"            # 10/09/2025
+    r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\b|"
+    r"\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b|"
+    r"\b(?:tomorrow|today|tonight|next|this)\b|"
+    r"\b\d{1,2}\s*(am|pm)\b)"
+)
+
+# Returned by resolve_common when the text needs the full dateparser search.
+UNRESOLVED = object()
+
+_DAY_OFFSETS = {"yesterday": -1, "today": 0, "tomorrow": 1}
+
+_MONTHS = ("january|february|march|april|may|june|july|august|september|october|november|december|"
+           "jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec")
+
+_MONTH_WORDS = frozenset(_MONTHS.split("|"))
+
+# Words that, with STRICT_PARSING, never yield a date on their own or combined
+# with each other (no year, or no day).
+_NO_DATE_WORDS = _MONTH_WORDS | frozenset(
+    "monday tuesday wednesday thursday friday saturday sunday "
+    "mon tue tues wed thu thur thurs fri sat sun next this tonight".split()
+)
+
+# dateparser's English vocabulary that can turn into (part of) a date or a
+# relative offset; any of these sends the text to dateparser.
+_DATEPARSER_WORDS = frozenset("""
+    now ago later after before from since till until date day days week weeks wk wks fortnight
+    month months mo year years yr yrs decade decades hour hours hr hrs minute minutes min mins
+    second seconds sec secs midnight noon morning afternoon evening night last past ad bc
+    one two three four five six seven eight nine ten eleven twelve
+""".split())
+
+_TIME_RE = re.compile(r"\b(?:(?:[01]?\d|2[0-3]):[0-5]\d(?:\s*(?:am|pm))?|(?:1[0-2]|0?[1-9])\s*(?:am|pm))\b")
+_DAY_MONTH_RE = re.compile(
+    rf"\b(?:(?:[1-9]|[12]\d|3[01])(?:st|nd|rd|th)?\s+(?:of\s+)?(?:{_MONTHS})"
+    rf"|(?:{_MONTHS})\s+(?:[1-9]|[12]\d|3[01])(?:st|nd|rd|th)?)\b(?!\s*[,/.:-]?\s*\d)"
+)
+
+# Timezone abbreviations known to dateparser (dateparser.timezones); next to a
+# clock time they can shift the result, so such texts go to dateparser.
+_TZ_WORDS = frozenset("""
+    acdt acst act acwdt acwst addt admt adt aedt aest aft ahdt ahst akdt akst aktst aktt
+    almst almt amst amt anast anat ant apt aqtst aqtt arst art ashst asht ast awdt awst awt
+    azomt azost azot azst azt bakst bakt bdst bdt beat beaut biot bmt bnt bort bost bot brst
+    brt bst btt burt cant capt cast cat cawt cct cddt cdt cedt cemt cest cet cgst cgt chadt
+    chast chdt chost chot chst cist ckhst ckt clst clt cmt cost cot cpt cst cut cvst cvt cwt
+    cxt dact davt ddut dft dmt dusst dust easst east eat ect eddt edt eedt eest eet egst egt
+    ehdt emt ept est et ewt fet ffmt fjst fjt fkst fkt fmt fnst fnt fort frust frut galt
+    gamt gbgt gest get gft ghst gilt git gmt gst gyt haa hac hadt hae hap har hast hat hay
+    hdt hkst hkt hlv hmt hna hnc hne hnp hnr hnt hny hovst hovt hst ict iddt idt ihst imt
+    iot irdt irkst irkt irst isst ist javt jcst jdt jmt jst jwst kart kdt kgst kgt kizst
+    kizt kmt kost krast krat kst kuyst kuyt kwat lhdt lhst lint lkt lmt lrt lst madmt madst
+    madt magst magt malst malt mart mawt mddt mdst mdt mest mesz met mez mht mist mit mmt
+    most mot mpt msd msk msm mst must mut mvt mwt myt ncst nct nddt ndt negt nest net nft
+    nmt novst novt npt nrt nst nt nut nwt nzdt nzmt nzst omsst omst orast orat pddt pdt pest
+    pet petst pett pgt phot phst pht pkst pkt plmt pmdt pmmt pmst pmt pnt pont ppmt ppt pst
+    pt pwt pyst pyt qmt qyzst qyzt ret rmt rott sakst sakt samt sast sbt sct sdmt sdt set
+    sgt shest shet sjmt slt smt sret srt sst stat svest svet swat syot taht tasst tast tbist
+    tbit tbmt tft tha tjt tkt tlt tmt tost tot trst trt tsat tvt ulast ulat urast urat ut
+    utc uyhst uyst uyt uzst uzt vet vlast vlat volst volt vost vust vut warst wart wast wat
+    wdt wedt wemt west wet wft wgst wgt wib wit wita wmt wsdt wsst wst wt xjt yakst yakt
+    yapt yddt ydt yekst yekt yerst yert ypt yst ywt zzz
+""".split())
+
+# Only plain ASCII words, digits and sentence punctuation are handled here;
+# apostrophes only inside contractions ("'today'" is not parsed like "today").
+_UNSAFE_CHARS = re.compile(r"[^a-z0-9\s.,!?:']|(?<!\w)'|'(?!\w)")
+_TOKEN_RE = re.compile(r"(?<!\w')\b\w+")  # skips contraction tails: the "m" of "i'm"
+# dateparser finds no date in a possessive or contracted day word
+# ("tomorrow's meeting", "today'll do"), so neither may the fast path.
+_DAY_CONTRACTION_RE = re.compile(r"\b(?:%s)'" % "|".join(_DAY_OFFSETS))
+
+
+def resolve_common(text: str, now: datetime):
+    """Resolve the common phrasings without dateparser.
+
+    Returns ``(date, time)`` like ``parse_datetime`` (either may be None), or
+    ``UNRESOLVED`` when the text is outside the grammar this handles.
+    """
+    low = text.lower()
+    if _UNSAFE_CHARS.search(low) or _DAY_CONTRACTION_RE.search(low):
+        return UNRESOLVED
+    # A clock time does not move a day word's date, and "<day> <month>" without a
+    # year yields no date -- but dateparser will combine loose digits with any
+    # other month into a day/year ("nov 9am" -> 2112-11-09), so those mixes are
+    # left to it.
+    low, n_times = _TIME_RE.subn(" ", low)
+    low, n_day_month = _DAY_MONTH_RE.subn(" ", low)
+    if n_times > 1 or n_day_month > 1 or (n_times and n_day_month):
+        return UNRESOLVED
+    tokens = _TOKEN_RE.findall(low)
+    has_month = n_day_month or not _MONTH_WORDS.isdisjoint(tokens)
+    day_words, other_date_words = [], n_day_month > 0
+    for tok in tokens:
+        if tok in _DAY_OFFSETS:
+            day_words.append(tok)
+        elif tok in _NO_DATE_WORDS:
+            if n_times and tok in _MONTH_WORDS:
+                return UNRESOLVED
+            other_date_words = True
+        elif tok in _DATEPARSER_WORDS or not tok.isalpha():
+            return UNRESOLVED
+        elif has_month and tok in ("a", "an"):  # read as the number 1
+            return UNRESOLVED
+        elif len(tok) == 1 and tok not in "ai":  # unit letters ("a d" = 1 day), "z" (UTC)
+            return UNRESOLVED
+        elif n_times and tok in _TZ_WORDS:
+            return UNRESOLVED
+    if not day_words:
+        return None, None
+    if len(day_words) > 1 or other_date_words:
+        return UNRESOLVED
+    day = now + timedelta(days=_DAY_OFFSETS[day_words[0]])
+    return day.strftime("%Y-%m-%d"), _extract_time(text)
+
+
+def _search_dates(text: str, now=None):
+    from dateparser.search import search_dates
+
+    settings = SEARCH_SETTINGS if now is None else {**SEARCH_SETTINGS, "RELATIVE_BASE": now}
+    res = search_dates(text, languages=["en"], settings=settings)
+    if not res:
+        return None, None
+
+    picked = None
+    for frag, dt in res:
+        if re.search(r"\d{4}[-/]\d{1,2}[-/]\d{1,2}", frag):
+            picked = dt
+            break
+    if picked is None:
+        picked = res[0][1]
+
+    return picked.strftime("%Y-%m-%d"), _extract_time(text)
+
+
+# Offsets finer than a day ("in 5 hours", "now") depend on the time of day.
+_INTRADAY_RE = re.compile(r"\b(?:now|hours?|hrs?|minutes?|mins?|seconds?|secs?|noon|midnight)\b|\d\s*[hms]\b", re.I)
+
+
+def date_cache_key(text: str, now: datetime):
+    """Key under which ``parse_datetime(text, now)`` can be reused for the rest of
+    ``now``'s day, or None when the result may change within the day."""
+    if text and _INTRADAY_RE.search(text):
+        return None
+    return text, now.date()
+
+
+def parse_datetime(text: str, now=None, fast=True):
+    """Return ``(YYYY-MM-DD, HH:MM)`` found in ``text``, relative to ``now``
+    (default: the current time); either part may be None/empty.
+
+    ``fast=False`` skips ``resolve_common`` (used to regenerate the golden corpus).
+    """
+    if not text:
+        return None, None
+
+    m = re.search(r"\b(\d{4})-(\d{2})-(\d{2})\b", text)
+    if m:
+        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}", _extract_time(text)
+
+    m = re.search(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b", text)
+    if m:
+        d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        if 1 <= d <= 31 and 1 <= mo <= 12:
+            return f"{y:04d}-{mo:02d}-{d:02d}", _extract_time(text)
+
+    if not re.search(DATE_HINT, text, flags=re.I):
+        return None, None
+
+    if fast:
+        res = resolve_common(text, now or datetime.now())
+        if res is not UNRESOLVED:
+            return res
+    metrics.inc("dateparser_fallbacks")
+    return _dateparser(text, now)
+
+
+_pool = None
+
+
+def _warm():
+    import dateparser.search  # noqa: F401 -- the first import takes ~0.3 s
+
+
+def start_parse_pool(workers: int):
+    """Run dateparser fallbacks in ``workers`` processes (0: in the calling thread).
+
+    Workers are forked and warmed immediately, so call this at startup, before
+    the server starts its threads. Returns the pool, or None.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+    if workers > 0:
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+
+        ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+        _pool = ProcessPoolExecutor(workers, mp_context=ctx, initializer=_warm)
+        for f in [_pool.submit(_warm) for _ in range(workers)]:
+            f.result()
+    return _pool
+
+
+@metrics.timed("dateparser")
+def _dateparser(text: str, now=None):
+    pool = _pool
+    if pool is not None:
+        try:
+            return pool.submit(_search_dates, text, now).result()
+        except BrokenExecutor:
+            log.exception("Date parse pool is broken; parsing in-process")
+    return _search_dates(text, now)
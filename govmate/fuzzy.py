@@ -0,0 +1,217 @@
+"""Typo- and inflection-tolerant keyword matching.
+
+``FuzzyIndex`` matches keyword variants token by token instead of as exact
+strings: both sides are lowercased, split into word tokens and stemmed
+("babies" -> "baby", "contracting" -> "contract", "deductable" and
+"deduction" -> "deduct"), and a message token may differ from a variant token
+by a small edit distance ("redundent" -> "redundant"). A variant matches when all of its tokens match
+consecutive message tokens; its score is the mean token similarity (1.0 for an
+exact token).
+
+Lookups go through a character-bigram index over the variant vocabulary and
+an inverted index from each variant's rarest token, so the work grows with the
+message, not with the number of rules.
+"""
+import re
+
+from govmate.matcher import _RE_FOLD
+from govmate.memo import TTLCache
+
+_TOKEN = re.compile(r"\w+")
+# (suffix, replacement), first match wins; the stem must keep >= 3 characters.
+_SUFFIXES = (("ies", "y"), ("ied", "y"), ("ing", ""), ("able", ""), ("ible", ""),
+             ("ions", ""), ("ion", ""), ("ed", ""), ("es", ""), ("s", ""))
+
+
+def stem(token: str) -> str:
+    """Crude suffix stripping; only needs to map inflections of one word together."""
+    if len(token) <= 3:
+        return token
+    for suffix, repl in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) + len(repl) >= 3:
+            if suffix == "s" and token.endswith(("ss", "us", "is")):
+                break
+            token = token[: -len(suffix)] + repl
+            break
+    if len(token) > 4 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+def tokens(text: str):
+    return [stem(t) for t in _TOKEN.findall((text or "").lower().translate(_RE_FOLD))]
+
+
+def max_distance(token: str) -> int:
+    """Edits tolerated for a token of this length: none for short words."""
+    n = len(token)
+    return 0 if n <= 3 else 1 if n <= 7 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or ``limit + 1`` as soon as it must exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+def _bigrams(word: str) -> set:
+    padded = f"^{word}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class NGramIndex:
+    """Vocabulary words by character bigram.
+
+    One edit changes at most two bigrams of a word, so a word within ``k``
+    edits of the query shares at least ``len(bigrams) - 2k`` of them; only
+    those candidates get an edit-distance check.
+    """
+
+    __slots__ = ("_words", "_ids", "_grams")
+
+    def __init__(self, words):
+        self._words = sorted(set(words))
+        self._ids = {w: i for i, w in enumerate(self._words)}
+        self._grams = {}
+        for i, w in enumerate(self._words):
+            for g in _bigrams(w):
+                self._grams.setdefault(g, []).append(i)
+
+    def __len__(self):
+        return len(self._words)
+
+    def search(self, word, k):
+        """``[(distance, word)]`` for every word at most ``k`` edits away."""
+        out = [(0, word)] if word in self._ids else []
+        if k == 0:
+            return out
+        grams = _bigrams(word)
+        need = len(grams) - 2 * k
+        shared = {}
+        for g in grams:
+            for i in self._grams.get(g, ()):
+                shared[i] = shared.get(i, 0) + 1
+        for i, n in shared.items():
+            w = self._words[i]
+            if n >= need and w != word and abs(len(w) - len(word)) <= k:
+                d = edit_distance(word, w, k)
+                if d <= k:
+                    out.append((d, w))
+        return out
+
+
+class FuzzyIndex:
+    """Token-level index over the rule table's keyword variants.
+
+    Built from the same ``(row_index, event_key, keyword_key, variants)`` rows
+    as ``KeywordIndex``; ``search`` returns hits in the same shape plus a
+    ``{row_index: score}`` map for ranking.
+    """
+
+    __slots__ = ("_rows", "_variants", "_variant_rows", "_by_anchor", "_vocab", "_lookups")
+
+    def __init__(self, rows):
+        self._rows = []
+        self._variants = []       # variant id -> (variant, stemmed tokens)
+        self._variant_rows = []   # variant id -> row positions
+        ids = {}
+        for idx, ev, key, variants in sorted(rows, key=lambda r: r[0]):
+            for v in variants:
+                toks = tuple(tokens(v))
+                if not toks:
+                    continue
+                vid = ids.get(toks)
+                if vid is None:
+                    vid = ids[toks] = len(self._variants)
+                    self._variants.append((v, toks))
+                    self._variant_rows.append([])
+                if len(self._rows) not in self._variant_rows[vid]:
+                    self._variant_rows[vid].append(len(self._rows))
+            self._rows.append((idx, ev, key))
+        self._vocab = NGramIndex(t for _, toks in self._variants for t in toks)
+        # Each variant is filed under its rarest token (and that token's
+        # position), so a common word like "new" does not pull in every
+        # variant that starts with it.
+        df = {}
+        for _, toks in self._variants:
+            for t in set(toks):
+                df[t] = df.get(t, 0) + 1
+        self._by_anchor = {}
+        for vid, (_, toks) in enumerate(self._variants):
+            pos = min(range(len(toks)), key=lambda j: df[toks[j]])
+            self._by_anchor.setdefault(toks[pos], []).append((vid, pos))
+        self._lookups = None
+
+    def __getstate__(self):
+        return {s: getattr(self, s) for s in self.__slots__ if s != "_lookups"}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+        self._lookups = None
+
+    def __len__(self):
+        return len(self._variants)
+
+    def similar(self, token: str) -> dict:
+        """``{vocabulary token: similarity}`` for tokens within ``max_distance``."""
+        if self._lookups is None:
+            self._lookups = TTLCache(8192)
+        return self._lookups.get_or_compute(token, lambda: {
+            w: 1.0 - d / max(len(w), len(token))
+            for d, w in self._vocab.search(token, max_distance(token))})
+
+    def search(self, user_text: str):
+        toks = tokens(user_text)
+        sims = [self.similar(t) for t in toks]
+        best = {}
+        for i, cands in enumerate(sims):
+            for word in cands:
+                for vid, pos in self._by_anchor.get(word, ()):
+                    vtoks = self._variants[vid][1]
+                    start = i - pos
+                    if start < 0 or start + len(vtoks) > len(toks):
+                        continue
+                    total = 0.0
+                    for j, vt in enumerate(vtoks):
+                        sj = sims[start + j].get(vt)
+                        if sj is None:
+                            break
+                        total += sj
+                    else:
+                        score = total / len(vtoks)
+                        if score > best.get(vid, 0.0):
+                            best[vid] = score
+        if not best:
+            return [], {}
+        by_row = {}
+        for vid, score in best.items():
+            for r in self._variant_rows[vid]:
+                by_row.setdefault(r, []).append((vid, score))
+        hits, weights = [], {}
+        for r in sorted(by_row):
+            idx, ev, key = self._rows[r]
+            matched = sorted(by_row[r])
+            hits.append((idx, ev, key, [self._variants[vid][0] for vid, _ in matched]))
+            weights[idx] = max(score for _, score in matched)
+        return hits, weights
+
+
+def with_fuzzy(exact_hits, index: FuzzyIndex, user_text: str):
+    """Exact hits (weight 1) plus the rows only ``index`` matched, weighted by
+    score, as ``(hits, weights)`` for ``EventRanker.rank``."""
+    fuzzy_hits, scores = index.search(user_text)
+    exact_rows = {h[0] for h in exact_hits}
+    extra = [h for h in fuzzy_hits if h[0] not in exact_rows]
+    if not extra:
+        return exact_hits, None
+    return sorted(exact_hits + extra, key=lambda h: h[0]), {h[0]: scores[h[0]] for h in extra}
@@ -0,0 +1,123 @@
+import re
+
+# Characters that ``re.IGNORECASE`` treats as equal to an ASCII letter even
+# after ``str.lower()``; folding them keeps the index in step with the regex scan.
+_RE_FOLD = str.maketrans("ıſ", "is")
+_WORD = re.compile(r"\w")
+
+
+def split_variants(variants_cell: str):
+    parts = [v.strip().lower() for v in str(variants_cell).split("|") if str(v).strip()]
+    seen, out = set(), []
+    for p in parts:
+        if p not in seen:
+            out.append(p); seen.add(p)
+    return out
+
+
+def _is_word(text: str, pos: int) -> bool:
+    return 0 <= pos < len(text) and _WORD.match(text[pos]) is not None
+
+
+def _at_boundary(text: str, pos: int) -> bool:
+    """Same test as the regex ``\\b`` anchor at ``pos``."""
+    return _is_word(text, pos - 1) != _is_word(text, pos)
+
+
+class KeywordIndex:
+    """Aho-Corasick automaton over every keyword variant in the rule table.
+
+    Built once from ``(row_index, event_key, keyword_key, variants)`` tuples;
+    ``search`` returns the same hits, in the same order, as scanning each row
+    with ``\\b<variant>\\b`` regexes, but in a single pass over the message.
+    """
+
+    __slots__ = ("_goto", "_fail", "_out", "_lengths", "_variant_rows", "_rows")
+
+    def __init__(self, rows):
+        self._goto = [{}]
+        self._out = [[]]
+        self._lengths = []
+        self._variant_rows = []
+        self._rows = []
+        ids = {}
+        for idx, ev, key, variants in sorted(rows, key=lambda r: r[0]):
+            pairs = []
+            for v in variants:
+                folded = v.translate(_RE_FOLD)
+                vid = ids.get(folded)
+                if vid is None:
+                    vid = ids[folded] = self._add(folded)
+                    self._variant_rows.append([])
+                self._variant_rows[vid].append(len(self._rows))
+                pairs.append((vid, v))
+            self._rows.append((idx, ev, key, tuple(pairs)))
+        self._link()
+        self._out = [tuple(o) for o in self._out]
+        self._variant_rows = [tuple(sorted(set(r))) for r in self._variant_rows]
+
+    def _add(self, pattern: str) -> int:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._out.append([])
+            node = nxt
+        vid = len(self._lengths)
+        self._lengths.append(len(pattern))
+        self._out[node].append(vid)
+        return vid
+
+    def _link(self):
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, nxt in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+                queue.append(nxt)
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def variants_by_event(self) -> dict:
+        """``{event_key: [variant, ...]}`` in rule-table order."""
+        by_event = {}
+        for _, ev, _, pairs in self._rows:
+            by_event.setdefault(ev, []).extend(v for _, v in pairs)
+        return by_event
+
+    def matched_variants(self, text_low: str) -> set:
+        """Ids of variants that occur in ``text_low`` between word boundaries."""
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        found = set()
+        node = 0
+        for pos, ch in enumerate(text_low):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for vid in out[node]:
+                if vid not in found and _at_boundary(text_low, pos + 1) \
+                        and _at_boundary(text_low, pos + 1 - lengths[vid]):
+                    found.add(vid)
+        return found
+
+    def search(self, user_text: str):
+        text_low = (user_text or "").lower().translate(_RE_FOLD)
+        found = self.matched_variants(text_low)
+        if not found:
+            return []
+        row_ids = sorted({r for vid in found for r in self._variant_rows[vid]})
+        hits = []
+        for r in row_ids:
+            idx, ev, key, pairs = self._rows[r]
+            hits.append((idx, ev, key, [v for vid, v in pairs if vid in found]))
+        return hits
+
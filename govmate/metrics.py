@@ -0,0 +1,221 @@
+"""Per-stage latency histograms and counters, exported as Prometheus text.
+
+Off unless ``GOVMATE_METRICS=1``. When off, ``timed`` and ``entry`` hand back
+the function unchanged and ``inc``/``observe`` return at once, so the hooks
+cost nothing. ``GOVMATE_SLOW_MS`` (with metrics on) logs every entry point
+slower than that many milliseconds, with a hash of its first argument (the chat
+message) and the time spent in each stage during that call.
+"""
+import contextvars
+import functools
+import hashlib
+import inspect
+import itertools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+log = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("GOVMATE_METRICS", "").lower() in ("1", "true", "yes", "on")
+SLOW_MS = float(os.environ.get("GOVMATE_SLOW_MS", 0) or 0)
+PREFIX = "govmate_"
+# Upper bounds in seconds; the stages range from microseconds to dateparser's tens of ms.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5)
+
+_call = contextvars.ContextVar("govmate_call", default=None)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "n")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.n += 1
+
+
+class Registry:
+    """Thread-safe stage histograms, labelled counters and gauge collectors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self._collectors = []
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = Histogram()
+            hist.observe(seconds)
+
+    def inc(self, name, labels=(), n=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def collect(self, fn):
+        """Add ``fn() -> [(name, {label: value}, number)]``, read on every render."""
+        self._collectors.append(fn)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            stages = {k: (list(h.counts), h.total, h.n) for k, h in self._stages.items()}
+            counters = dict(self._counters)
+        lines = [f"# TYPE {PREFIX}stage_duration_seconds histogram"]
+        for stage, (counts, total, n) in sorted(stages.items()):
+            cumulative = 0
+            for bound, c in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += c
+                lines.append(f'{PREFIX}stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}stage_duration_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{PREFIX}stage_duration_seconds_count{{stage="{stage}"}} {n}')
+        typed = set()
+        for (name, labels), value in sorted(counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {PREFIX}{name}_total counter")
+                typed.add(name)
+            lines.append(f"{PREFIX}{name}_total{_labels(dict(labels))} {value}")
+        for fn in self._collectors:
+            for name, labels, value in fn():
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+REGISTRY = Registry()
+
+
+def observe(stage, seconds):
+    if not ENABLED:
+        return
+    REGISTRY.observe(stage, seconds)
+    call = _call.get()
+    if call is not None:
+        call[stage] = call.get(stage, 0.0) + seconds
+
+
+def inc(name, n=1, **labels):
+    if ENABLED:
+        REGISTRY.inc(name, tuple(sorted(labels.items())), n)
+
+
+def timed(stage):
+    """Decorator: record each call's duration as ``stage``."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - t0)
+        return inner
+    return wrap
+
+
+def message_hash(value) -> str:
+    return hashlib.sha256(str(value).encode("utf-8")).hexdigest()[:12]
+
+
+def _finish(stage, elapsed, stages, args):
+    REGISTRY.observe(stage, elapsed)
+    if SLOW_MS and elapsed * 1000 >= SLOW_MS:
+        log.warning("slow %s: %.1f ms, message %s, stages %s", stage, elapsed * 1000,
+                    message_hash(args[0] if args else ""),
+                    ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in stages.items()) or "-")
+
+
+def entry(stage):
+    """Like ``timed``, for UI callbacks: also collects the stages run inside the
+    call and logs it when it is slower than ``SLOW_MS``. Nested entry points
+    (a callback calling another) only count as a stage of the outer one.
+
+    Generator callbacks (streamed replies) stay generators, so Gradio still
+    streams them. Their time is the time spent producing items, not waiting
+    for the consumer, and the time to the first item is also recorded, as
+    ``<stage>.first_chunk``."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen(*args, **kwargs):
+                if _call.get() is not None:
+                    yield from fn(*args, **kwargs)
+                    return
+                # Gradio may run each step in a different worker thread, so the
+                # stage collector is set around every step, not the whole call.
+                stages, busy, it = {}, 0.0, fn(*args, **kwargs)
+                try:
+                    for n in itertools.count():
+                        token = _call.set(stages)
+                        t0 = time.perf_counter()
+                        try:
+                            item = next(it)
+                        except StopIteration:
+                            return
+                        finally:
+                            busy += time.perf_counter() - t0
+                            _call.reset(token)
+                        if n == 0:
+                            REGISTRY.observe(f"{stage}.first_chunk", busy)
+                        yield item
+                finally:
+                    it.close()
+                    _finish(stage, busy, stages, args)
+            return gen
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if _call.get() is not None:
+                return timed(stage)(fn)(*args, **kwargs)
+            token = _call.set({})
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - t0
+                stages = _call.get()
+                _call.reset(token)
+                _finish(stage, elapsed, stages, args)
+        return inner
+    return wrap
+
+
+def routes(path="/metrics"):
+    """Starlette routes serving the registry, for ``launch(app_kwargs={"routes": ...})``.
+    Empty when metrics are off."""
+    if not ENABLED:
+        return []
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    def metrics(request):
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+    return [Route(path, metrics)]
@@ -0,0 +1,103 @@
+"""Rank every matched life event for a message, not just the top one.
+
+``EventRanker`` turns the rule table into one sparse weight vector per event,
+``{variant: weight}``, when the rules are compiled. A variant's weight is the
+largest ``weight`` of the rows that list it (1 when the sheet has no ``weight``
+column), scaled by an IDF factor: a variant that also occurs inside the
+keyword variants of other events ("baby" in "new baby documents") says less
+about any one of them. Scoring a message adds up the weights of the variants
+it matched, so it only touches the hits, however large the rule table grows.
+"""
+import heapq
+import math
+
+from govmate import metrics
+
+
+def row_weight(value) -> float:
+    """A rule row's ``weight`` cell as a positive float (blank or invalid: 1)."""
+    try:
+        w = float(value)
+    except (TypeError, ValueError):
+        return 1.0
+    return w if w > 0 else 1.0  # also rejects NaN from an empty cell
+
+
+class EventRanker:
+    """Per-event keyword-variant weight vectors, built from the same
+    ``(row_index, event_key, keyword_key, variants)`` rows as ``KeywordIndex``.
+
+    ``index`` is that KeywordIndex, used to find which variants occur inside
+    each event's own variants; ``weights`` maps row index to its ``weight``.
+    """
+
+    __slots__ = ("_vectors", "_idf", "_first_row")
+
+    def __init__(self, rows, index, weights=None):
+        weights = weights or {}
+        self._vectors, self._first_row = {}, {}
+        for idx, ev, _, variants in sorted(rows, key=lambda r: r[0]):
+            self._first_row.setdefault(ev, idx)
+            vec = self._vectors.setdefault(ev, {})
+            w = weights.get(idx, 1.0)
+            for v in variants:
+                vec[v] = max(vec.get(v, 0.0), w)
+        # Document frequency: the number of events whose variants contain the
+        # variant as a phrase, found by running the index over each event's text.
+        df = {}
+        for vec in self._vectors.values():
+            found = {v for hit in index.search(" | ".join(vec)) for v in hit[3]}
+            for v in found:
+                df[v] = df.get(v, 0) + 1
+        n = len(self._vectors)
+        self._idf = {v: math.log(1 + n / d) for v, d in df.items()}
+        for vec in self._vectors.values():
+            for v in vec:
+                vec[v] *= self._idf.get(v, math.log(1 + n))
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def scores(self, hits, weights=None) -> dict:
+        """``{event_key: score}`` for every event with a hit.
+
+        Each matched variant counts once per event, times its ``weights`` entry
+        (the fuzzy match score; default 1) for the best row that matched it.
+        A variant inside another matched variant of the same event ("new job"
+        in "starting a new job") is the same evidence and is not counted again.
+        """
+        best = {}
+        for idx, ev, _, matched in hits:
+            w = weights.get(idx, 1.0) if weights else 1.0
+            found = best.setdefault(ev, {})
+            for v in matched:
+                if w > found.get(v, 0.0):
+                    found[v] = w
+        out = {}
+        for ev, found in best.items():
+            vec = self._vectors.get(ev, {})
+            padded = {v: f" {v} " for v in found}
+            out[ev] = sum(w * vec.get(v, self._idf.get(v, 1.0)) for v, w in found.items()
+                          if not any(p != padded[v] and padded[v] in p for p in padded.values()))
+        return out
+
+    @metrics.timed("rank_events")
+    def rank(self, hits, weights=None, k=3):
+        """``top``, timed as the ``rank_events`` stage: the path chat turns take."""
+        return self.top(hits, weights, k)
+
+    def top(self, hits, weights=None, k=3):
+        """The ``k`` best events as ``[(event_key, score, hits)]``, best first.
+
+        Ties go to the event that comes first in the rule table; each event's
+        hits are in row order.
+        """
+        if not hits:
+            return []
+        scores = self.scores(hits, weights)
+        top = heapq.nlargest(k, scores, key=lambda e: (scores[e], -self._first_row.get(e, 0)))
+        by_event = {ev: [] for ev in top}
+        for h in hits:
+            if h[1] in by_event:
+                by_event[h[1]].append(h)
+        return [(ev, scores[ev], sorted(by_event[ev], key=lambda h: h[0])) for ev in top]
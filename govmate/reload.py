@@ -0,0 +1,74 @@
+import logging
+import os
+import threading
+
+from govmate.rules import load_rules
+
+log = logging.getLogger(__name__)
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class RulesWatcher:
+    """Keeps the current RuleSet and swaps in a rebuilt one when the workbook changes.
+
+    A background thread polls the workbook's mtime/size every ``interval``
+    seconds and rebuilds via ``load_rules`` (which also refreshes the cache).
+    Readers take ``watcher.rules`` once per request: the RuleSet is immutable
+    and replaced by a single attribute assignment, so a request never sees a
+    mix of old and new rules. A failed rebuild keeps the previous RuleSet.
+    ``on_reload`` callables get each new RuleSet after it has been swapped in.
+    """
+
+    def __init__(self, path="rules.xlsx", interval=2.0, cache_path=None, on_reload=()):
+        self.path = path
+        self.interval = interval
+        self.cache_path = cache_path
+        self.on_reload = list(on_reload)
+        self._stamp = _stamp(path)
+        self.rules = load_rules(path, cache_path)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self) -> bool:
+        """Reload if the workbook changed since the last attempt; True if swapped."""
+        stamp = _stamp(self.path)
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            rules = load_rules(self.path, self.cache_path)
+        except Exception:
+            log.exception("Reloading %s failed; keeping the previous rules", self.path)
+            return False
+        self.rules = rules
+        log.info("Reloaded %s: %d rows, %d variants", self.path, len(rules.store), len(rules.index))
+        for callback in self.on_reload:
+            try:
+                callback(rules)
+            except Exception:
+                log.exception("Reload callback %r failed", callback)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="rules-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,182 @@
+import logging
+import sqlite3
+import threading
+
+from govmate import metrics
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    user    TEXT    NOT NULL,
+    title   TEXT    NOT NULL,
+    date    TEXT    NOT NULL DEFAULT '',
+    time    TEXT    NOT NULL DEFAULT '',
+    notes   TEXT    NOT NULL DEFAULT '',
+    done    INTEGER NOT NULL DEFAULT 0,
+    notified INTEGER NOT NULL DEFAULT 0,
+    banner  INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS reminders_by_user_due ON reminders (user, done, {date_key}, {time_key}, id);
+CREATE INDEX IF NOT EXISTS reminders_banner ON reminders (user) WHERE banner = 1;
+"""
+
+# Undated/untimed reminders sort last, as render_task_list always did.
+_DATE_KEY = "COALESCE(NULLIF(date, ''), '9999-12-31')"
+_TIME_KEY = "COALESCE(NULLIF(time, ''), '23:59')"
+_ORDER = f"done, {_DATE_KEY}, {_TIME_KEY}, id"
+_COLUMNS = "id, title, date, time, notes, done"
+
+
+def _row(r):
+    return {"id": r[0], "title": r[1], "date": r[2], "time": r[3], "notes": r[4], "done": bool(r[5])}
+
+
+class ReminderStore:
+    """Reminders persisted in a local SQLite file (WAL mode), keyed per user.
+
+    Rows are indexed on (user, done, date, time), so updates are single-row
+    primary-key writes and ``list`` is an ordered index range read.
+    Each thread gets its own connection. ``listeners`` are called as
+    ``fn(kind, user, reminder_or_id)`` after each add, toggle and delete.
+    """
+
+    def __init__(self, path="govmate.db"):
+        self.path = path
+        self.listeners = []
+        self._local = threading.local()
+        with self._conn() as conn:
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(reminders)")}
+            for column in ("notified", "banner"):  # databases from before the scheduler
+                if columns and column not in columns:
+                    conn.execute(f"ALTER TABLE reminders ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            conn.executescript(_SCHEMA.format(date_key=_DATE_KEY, time_key=_TIME_KEY))
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _changed(self, kind, user, value):
+        for fn in self.listeners:
+            try:
+                fn(kind, user, value)
+            except Exception:
+                log.exception("Reminder listener %r failed", fn)
+
+    @metrics.timed("reminders.add")
+    def add(self, user, title, date="", time="", notes=""):
+        with self._conn() as conn:
+            cur = conn.execute(
+                "INSERT INTO reminders (user, title, date, time, notes) VALUES (?, ?, ?, ?, ?)",
+                (user, title, date or "", time or "", notes or ""),
+            )
+        row = {"id": cur.lastrowid, "title": title, "date": date or "", "time": time or "",
+               "notes": notes or "", "done": False}
+        self._changed("add", user, row)
+        return row
+
+    def get(self, user, rid):
+        r = self._conn().execute(f"SELECT {_COLUMNS} FROM reminders WHERE id = ? AND user = ?",
+                                 (rid, user)).fetchone()
+        return _row(r) if r else None
+
+    @metrics.timed("reminders.toggle")
+    def toggle(self, user, rid) -> bool:
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE reminders SET done = 1 - done WHERE id = ? AND user = ?", (rid, user))
+        if cur.rowcount:
+            self._changed("toggle", user, rid)
+        return cur.rowcount > 0
+
+    @metrics.timed("reminders.delete")
+    def delete(self, user, rid) -> bool:
+        with self._conn() as conn:
+            cur = conn.execute("DELETE FROM reminders WHERE id = ? AND user = ?", (rid, user))
+        if cur.rowcount:
+            self._changed("delete", user, rid)
+        return cur.rowcount > 0
+
+    def list(self, user):
+        """All of ``user``'s reminders: pending first, then by date and time."""
+        return self.query(user)
+
+    @staticmethod
+    def _where(user, start, end, done):
+        sql, args = ["user = ?"], [user]
+        if done is not None:
+            sql.append("done = ?"); args.append(int(done))
+        if start:
+            sql.append(f"{_DATE_KEY} >= ?"); args.append(start)
+        if end:
+            sql.append(f"{_DATE_KEY} <= ?"); args.append(end)
+        return " AND ".join(sql), args
+
+    @metrics.timed("reminders.query")
+    def query(self, user, start=None, end=None, done=None, limit=None, offset=0):
+        """Reminders in ``list`` order, optionally restricted to a date range
+        (inclusive, YYYY-MM-DD; undated reminders count as 9999-12-31) and a
+        done state, one ``limit``-sized window at a time."""
+        where, args = self._where(user, start, end, done)
+        sql = f"SELECT {_COLUMNS} FROM reminders WHERE {where} ORDER BY {_ORDER}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"; args += [limit, offset]
+        return [_row(r) for r in self._conn().execute(sql, args).fetchall()]
+
+    @metrics.timed("reminders.count")
+    def count(self, user, start=None, end=None, done=None) -> int:
+        where, args = self._where(user, start, end, done)
+        return self._conn().execute(f"SELECT COUNT(*) FROM reminders WHERE {where}", args).fetchone()[0]
+
+    @metrics.timed("reminders.search")
+    def search(self, user, text, limit=50):
+        """Reminders whose title contains ``text`` (case-insensitive), in ``list`` order."""
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self._conn().execute(
+            f"SELECT {_COLUMNS} FROM reminders WHERE user = ? AND title LIKE ? ESCAPE '\\' "
+            f"ORDER BY {_ORDER} LIMIT ?", (user, pattern, limit)
+        ).fetchall()
+        return [_row(r) for r in rows]
+
+    def pending(self, since=""):
+        """``(id, user, date, time)`` of every dated reminder, across users, that
+        is neither done nor notified yet, dated ``since`` (YYYY-MM-DD) or later."""
+        return self._conn().execute(
+            "SELECT id, user, date, time FROM reminders "
+            "WHERE done = 0 AND notified = 0 AND date != '' AND date >= ?", (since,)).fetchall()
+
+    def claim(self, rid) -> bool:
+        """Mark a pending reminder as notified; False if it is done, deleted or
+        already claimed (by this or another process sharing the file)."""
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE reminders SET notified = 1 WHERE id = ? AND done = 0 AND notified = 0",
+                               (rid,))
+        return cur.rowcount > 0
+
+    def queue_banner(self, rid):
+        """Flag a fired reminder for its owner's 🔔 banner."""
+        with self._conn() as conn:
+            conn.execute("UPDATE reminders SET banner = 1 WHERE id = ?", (rid,))
+
+    @metrics.timed("reminders.take_banners")
+    def take_banners(self, user):
+        """``user``'s reminders flagged for the banner, oldest due first, with the
+        flags cleared: each is returned once, whichever process sharing the file
+        asks. Reminders completed since they fired are cleared but not returned."""
+        rows = self._conn().execute(
+            f"SELECT {_COLUMNS} FROM reminders WHERE user = ? AND banner = 1 ORDER BY {_DATE_KEY}, {_TIME_KEY}, id",
+            (user,)).fetchall()
+        if not rows:
+            return []
+        taken = []
+        with self._conn() as conn:
+            for r in rows:
+                cur = conn.execute("UPDATE reminders SET banner = 0 WHERE id = ? AND banner = 1", (r[0],))
+                if cur.rowcount and not r[5]:
+                    taken.append(_row(r))
+        return taken
@@ -0,0 +1,45 @@
+from typing import NamedTuple
+
+
+class RuleRecord(NamedTuple):
+    """One rule-table row with its answer text already rendered."""
+    idx: int
+    event_key: str
+    keyword_key: str
+    bullet: str          # "- <short_answer>", or "" when the answer is blank
+    source_url: str     # "" when the row has no source
+    source_line: str    # "- <source_title>: <source_url>"
+
+
+def rule_record(idx, row) -> RuleRecord:
+    """Render a row dict the same way compose_answer_from_rows/render_sources did."""
+    ans = str(row.get("short_answer", "")).strip()
+    url = str(row.get("source_url", "")).strip()
+    title = (str(row.get("source_title") or "Official source")).strip()
+    return RuleRecord(
+        idx=idx,
+        event_key=str(row.get("event_key", "")).strip(),
+        keyword_key=str(row.get("keyword_key", "")),
+        bullet=f"- {ans}" if ans else "",
+        source_url=url,
+        source_line=f"- {title}: {url}" if url else "",
+    )
+
+
+class RuleStore:
+    """Immutable lookup of pre-rendered rule records by row index.
+
+    Built once from ``(row_index, row_dict)`` pairs so the answer path never
+    touches the DataFrame.
+    """
+
+    __slots__ = ("_by_idx",)
+
+    def __init__(self, rows):
+        self._by_idx = {idx: rule_record(idx, row) for idx, row in rows}
+
+    def __getitem__(self, idx) -> RuleRecord:
+        return self._by_idx[idx]
+
+    def __len__(self):
+        return len(self._by_idx)
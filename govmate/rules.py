@@ -0,0 +1,134 @@
+"""Load the rule workbook into a RuleSet, via a pickle cache keyed on its content hash.
+
+The first load (or any load after rules.xlsx changes) parses the workbook with
+pandas and writes ``<workbook>.cache.pkl`` next to it; later loads only unpickle
+the prebuilt matcher and rule store. Compile ahead of time with::
+
+    python -m govmate.rules [rules.xlsx] [--force]
+"""
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import time
+from typing import NamedTuple
+
+from govmate.fuzzy import FuzzyIndex
+from govmate.matcher import KeywordIndex, split_variants
+from govmate.ranking import EventRanker, row_weight
+from govmate.rule_store import RuleStore
+
+log = logging.getLogger(__name__)
+
+SHEET_NAME = "Keyword definition"
+# Bump whenever RuleSet or anything it pickles changes shape (or the fuzzy
+# stemmer changes, since FuzzyIndex stores stemmed tokens).
+CACHE_FORMAT = 5
+
+
+class RuleSet(NamedTuple):
+    index: KeywordIndex
+    store: RuleStore
+    fuzzy: FuzzyIndex
+    ranker: EventRanker
+
+
+def read_table(path):
+    import pandas as pd
+    return pd.read_excel(path, sheet_name=SHEET_NAME)
+
+
+def build_rules(keyword_table) -> RuleSet:
+    rows = list(keyword_table.iterrows())
+    keywords = [(i, str(row["event_key"]).strip(), str(row["keyword_key"]).strip(),
+                 split_variants(row["keyword_variants"])) for i, row in rows]
+    weights = {i: row_weight(row.get("weight")) for i, row in rows}
+    store = RuleStore((i, row.to_dict()) for i, row in rows)
+    index = KeywordIndex(keywords)
+    return RuleSet(index, store, FuzzyIndex(keywords), EventRanker(keywords, index, weights))
+
+
+def cache_path_for(path) -> str:
+    return f"{path}.cache.pkl"
+
+
+def file_sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_cache(cache_path, path, st):
+    """Return the cached RuleSet if it was built from this workbook, else None."""
+    try:
+        with open(cache_path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("format") != CACHE_FORMAT:
+                return None
+            if (header.get("mtime_ns"), header.get("size")) != (st.st_mtime_ns, st.st_size) \
+                    and header.get("sha256") != file_sha256(path):
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning("Ignoring unreadable rules cache %s: %s", cache_path, e)
+        return None
+
+
+def _write_cache(cache_path, path, st, rules):
+    header = {"format": CACHE_FORMAT, "sha256": file_sha256(path),
+              "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(rules, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        log.warning("Could not write rules cache %s: %s", cache_path, e)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def compile_rules(path="rules.xlsx", cache_path=None) -> RuleSet:
+    """Parse the workbook and (re)write its cache unconditionally."""
+    st = os.stat(path)
+    rules = build_rules(read_table(path))
+    _write_cache(cache_path or cache_path_for(path), path, st, rules)
+    return rules
+
+
+def load_rules(path="rules.xlsx", cache_path=None) -> RuleSet:
+    """Load rules from the cache, recompiling when the workbook has changed."""
+    st = os.stat(path)
+    rules = _read_cache(cache_path or cache_path_for(path), path, st)
+    if rules is None:
+        log.info("Compiling %s (cache missing or stale)", path)
+        rules = compile_rules(path, cache_path)
+    return rules
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compile the rule workbook into its binary cache.")
+    ap.add_argument("workbook", nargs="?", default="rules.xlsx")
+    ap.add_argument("--cache", default=None, help="cache file (default: <workbook>.cache.pkl)")
+    ap.add_argument("--force", action="store_true", help="recompile even if the cache is fresh")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    rules = (compile_rules if args.force else load_rules)(args.workbook, args.cache)
+    print(f"{args.cache or cache_path_for(args.workbook)}: {len(rules.store)} rows, "
+          f"{len(rules.index)} variants ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    # Go through the importable module so the pickled RuleSet resolves as
+    # govmate.rules.RuleSet rather than __main__.RuleSet.
+    from govmate.rules import main
+    main()
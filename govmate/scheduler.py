@@ -0,0 +1,294 @@
+"""Fire reminders when they fall due, and export them as iCalendar.
+
+``ReminderScheduler`` keeps every pending, dated reminder in a min-heap keyed
+on its due time and sleeps until the earliest one, so an idle server does no
+work however many reminders are waiting. It listens to the ReminderStore, so
+reminders added, toggled or deleted from the chat or the 📅 tab are
+(re)scheduled as they change: O(log n) to add, and O(1) to drop (the heap
+entry is only marked, and skipped when it surfaces).
+
+A due reminder is first claimed in the database (``ReminderStore.claim``), so
+with several server processes sharing one file each reminder is delivered
+once, by whichever process gets there first. It then goes to every sink: any
+callable ``sink(user, reminder)``, such as ``LogSink``, ``WebhookSink`` or
+``BannerSink``.
+"""
+import heapq
+import json
+import logging
+import threading
+from datetime import date as _date, datetime, time as _time, timedelta, timezone
+
+from govmate import metrics
+
+log = logging.getLogger(__name__)
+
+# Reminders with a date but no time fall due at this time of day.
+DEFAULT_TIME = _time(9, 0)
+# Longest single sleep, so a wall-clock change is noticed within this long.
+MAX_WAIT = 3600.0
+
+
+def _clock_time(time_str):
+    """The reminder's time of day, or None when it is blank or not a valid time."""
+    try:
+        return _time.fromisoformat(time_str) if time_str else None
+    except (TypeError, ValueError):
+        return None
+
+
+def due_at(date_str, time_str=""):
+    """The reminder's due datetime, or None when it has no (valid) date.
+
+    Without a valid time it falls due at ``DEFAULT_TIME``.
+    """
+    try:
+        d = _date.fromisoformat(date_str)
+    except (TypeError, ValueError):
+        return None
+    return datetime.combine(d, _clock_time(time_str) or DEFAULT_TIME)
+
+
+class LogSink:
+    """Log each due reminder."""
+
+    def __call__(self, user, reminder):
+        log.info("Reminder due for %s: %s (%s %s)", user, reminder["title"], reminder["date"], reminder["time"])
+
+
+class WebhookSink:
+    """POST each due reminder as JSON to ``url``, e.g. a local notification service."""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, user, reminder):
+        import urllib.request  # http.client and friends, only when a webhook is configured
+        body = json.dumps({"user": user, "reminder": reminder}).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout):
+            pass
+
+
+class BannerSink:
+    """Flag each due reminder for the user's banner until the UI takes it.
+
+    The flag is kept in the ReminderStore, not in this process: with
+    ``--processes N`` the reminder may fire in any process, but the user's page
+    polls the one its sticky session is pinned to.
+    """
+
+    def __init__(self, store, per_user=10):
+        self.store = store
+        self.per_user = per_user
+
+    def __call__(self, user, reminder):
+        self.store.queue_banner(reminder["id"])
+
+    def take(self, user):
+        """The user's undelivered reminders (the latest ``per_user``), oldest
+        first; each is returned once."""
+        return self.store.take_banners(user)[-self.per_user:]
+
+
+class ReminderScheduler:
+    """Min-heap of pending reminders, fired by one background thread.
+
+    Heap entries are ``[due, id, user, live]``; ``_entries`` maps id to its live
+    entry. Reminders already more than ``catch_up`` overdue when they are
+    loaded, added or reopened are not fired; they stay in the 📅 tab's Overdue
+    view.
+    """
+
+    def __init__(self, store, sinks=(), catch_up=timedelta(hours=24), clock=datetime.now):
+        self.store = store
+        self.sinks = list(sinks)
+        self.catch_up = catch_up
+        self._clock = clock
+        self._heap = []
+        self._entries = {}
+        self._dead = 0
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self.fired = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def schedule(self, rid, user, date_str, time_str=""):
+        """Add or move a reminder; undated ones, and ones more than ``catch_up``
+        overdue, are ignored. O(log n)."""
+        due = due_at(date_str, time_str)
+        with self._cond:
+            self._drop(rid)
+            if due is None or due < self._clock() - self.catch_up:
+                return
+            entry = [due, rid, user, True]
+            self._entries[rid] = entry
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._cond.notify()  # the thread is sleeping until a later reminder
+
+    def cancel(self, rid):
+        with self._cond:
+            self._drop(rid)
+
+    def _drop(self, rid):
+        entry = self._entries.pop(rid, None)
+        if entry is not None:
+            entry[3] = False
+            self._dead += 1
+            if self._dead > 1024 and self._dead > len(self._heap) // 2:
+                self._heap = [e for e in self._heap if e[3]]
+                heapq.heapify(self._heap)
+                self._dead = 0
+
+    def on_change(self, kind, user, value):
+        """ReminderStore listener."""
+        if kind == "add":
+            if not value["done"]:
+                self.schedule(value["id"], user, value["date"], value["time"])
+        elif kind == "delete" or (kind == "toggle" and value in self._entries):
+            self.cancel(value)
+        elif kind == "toggle":
+            row = self.store.get(user, value)
+            if row and not row["done"]:
+                self.schedule(row["id"], user, row["date"], row["time"])
+
+    def load(self):
+        """Schedule every pending reminder in the store, once at start."""
+        since = self._clock() - self.catch_up
+        for rid, user, d, t in self.store.pending(since.date().isoformat()):
+            self.schedule(rid, user, d, t)
+
+    def _next_due(self):
+        """Block until reminders are due; return ``[(id, user)]`` (empty when stopping)."""
+        with self._cond:
+            while not self._stop:
+                while self._heap and not self._heap[0][3]:
+                    heapq.heappop(self._heap)
+                    self._dead -= 1
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = (self._heap[0][0] - self._clock()).total_seconds()
+                if wait > 0:
+                    self._cond.wait(min(wait, MAX_WAIT))
+                    continue
+                now, due = self._clock(), []
+                while self._heap and self._heap[0][0] <= now:
+                    _, rid, user, live = heapq.heappop(self._heap)
+                    if live:
+                        del self._entries[rid]
+                        due.append((rid, user))
+                    else:
+                        self._dead -= 1
+                return due
+            return []
+
+    def fire(self, rid, user):
+        """Deliver one due reminder to every sink, unless another process
+        already did or it was completed or deleted in the meantime."""
+        if not self.store.claim(rid):
+            return False
+        reminder = self.store.get(user, rid)
+        for sink in self.sinks:
+            try:
+                sink(user, reminder)
+            except Exception:
+                log.exception("Reminder sink %r failed", sink)
+        self.fired += 1
+        metrics.inc("reminders_fired")
+        return True
+
+    def _run(self):
+        while True:
+            due = self._next_due()
+            if not due:
+                return
+            for rid, user in due:
+                self.fire(rid, user)
+
+    def start(self):
+        if self._thread is None:
+            self.store.listeners.append(self.on_change)
+            self.load()
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.store.listeners.remove(self.on_change)
+
+
+def _ics_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _ics_fold(line):
+    """Split a content line into 75-octet pieces, as RFC 5545 requires."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:  # never split a UTF-8 sequence
+            end -= 1
+        parts.append(raw[start:end].decode("utf-8"))
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _ics_offset(t):
+    """A time of day as an iCalendar duration from midnight ("PT9H", "PT9H30M")."""
+    return f"PT{t.hour}H" + (f"{t.minute}M" if t.minute else "")
+
+
+def ics_lines(reminders, stamp=None):
+    """iCalendar lines for dated reminders, one VEVENT each, with an alarm at
+    the due time; undated reminders are skipped. Times are local (floating);
+    a reminder without a valid time is an all-day event, whose alarm goes off
+    at ``DEFAULT_TIME`` like the scheduler's."""
+    stamp = (stamp or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield "PRODID:-//GovMate//Reminders//EN"
+    for r in reminders:
+        due = due_at(r.get("date", ""), r.get("time", ""))
+        if due is None:
+            continue
+        yield "BEGIN:VEVENT"
+        yield f"UID:govmate-reminder-{r['id']}"
+        yield f"DTSTAMP:{stamp}"
+        timed = _clock_time(r.get("time", "")) is not None
+        if timed:
+            yield f"DTSTART:{due:%Y%m%dT%H%M%S}"
+        else:
+            yield f"DTSTART;VALUE=DATE:{due:%Y%m%d}"
+        yield _ics_fold("SUMMARY:" + ("✅ " if r.get("done") else "") + _ics_text(r.get("title") or "Reminder"))
+        if r.get("notes"):
+            yield _ics_fold("DESCRIPTION:" + _ics_text(r["notes"]))
+        if not r.get("done"):
+            yield "BEGIN:VALARM"
+            yield "ACTION:DISPLAY"
+            yield _ics_fold("DESCRIPTION:" + _ics_text(r.get("title") or "Reminder"))
+            yield "TRIGGER:" + ("PT0S" if timed else _ics_offset(DEFAULT_TIME))
+            yield "END:VALARM"
+        yield "END:VEVENT"
+    yield "END:VCALENDAR"
+
+
+def to_ics(reminders, stamp=None) -> str:
+    """A whole .ics file (CRLF line endings) for ``reminders``."""
+    return "\r\n".join(ics_lines(reminders, stamp)) + "\r\n"